@@ -1,6 +1,234 @@
 import json
+import queue
+import threading
+from collections import Counter
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import column, table, text
+
+from .config import settings
+from .db import SessionLocal
+from .periodic import PeriodicWorker
+from .server_timing import phase
+
+
+activity_log_table = table(
+    "activity_log",
+    column("timestamp"),
+    column("actor_user_id"),
+    column("actor_email"),
+    column("action"),
+    column("entity_type"),
+    column("entity_id"),
+    column("details"),
+)
+
+
+def _record(request, action, entity_type, entity_id, details) -> dict:
+    actor_user_id = None
+    actor_email = None
+
+    if request and hasattr(request.state, "user") and request.state.user:
+        actor_user_id = request.state.user.id
+        actor_email = request.state.user.email
+
+    return {
+        "timestamp": datetime.utcnow(),
+        "actor_user_id": actor_user_id,
+        "actor_email": actor_email,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": json.dumps(details) if details else None,
+    }
+
+
+_ROLLUP_UPSERT = text("""
+    INSERT INTO activity_rollups (day, action, actor_user_id, count)
+    VALUES (:day, :action, :actor, :n)
+    ON CONFLICT (day, action, actor_user_id)
+    DO UPDATE SET count = activity_rollups.count + excluded.count
+""")
+
+
+def _rollup_params(records: list[dict]) -> list[dict]:
+    counts = Counter(
+        (r["timestamp"].date().isoformat(), r["action"], r["actor_user_id"] or 0)
+        for r in records
+    )
+    return [{"day": day, "action": action, "actor": actor, "n": n} for (day, action, actor), n in counts.items()]
+
+
+def bump_rollups(db, records: list[dict]) -> None:
+    """
+    Add `records` to activity_rollups. Called in the same transaction as
+    the activity_log insert so the two never drift apart.
+    """
+    db.execute(_ROLLUP_UPSERT, _rollup_params(records))
+
+
+_ROLLUP_COUNT_RANGE = """
+    INSERT INTO {table} (day, action, actor_user_id, count)
+    SELECT date(timestamp), action, COALESCE(actor_user_id, 0), COUNT(*)
+    FROM activity_log
+    WHERE id >= :start AND id < :end
+    GROUP BY date(timestamp), action, COALESCE(actor_user_id, 0)
+    ON CONFLICT (day, action, actor_user_id)
+    DO UPDATE SET count = {table}.count + excluded.count
+"""
+
+
+def rebuild_rollups(db, chunk_size: int = 50000, progress=None) -> int:
+    """
+    Recompute activity_rollups from the live activity_log. Rows already
+    moved to archives (see activity_retention) are not counted.
+
+    The counts are built in a staging table, walking activity_log in id
+    ranges of `chunk_size` up to the MAX(id) seen at the start and
+    committing after each pass, while the live table keeps serving the old
+    totals. A final short transaction locks activity_rollups, adds the rows
+    logged since the start (their live bumps would otherwise be lost) and
+    swaps the staging counts in, so nothing is counted twice or missed and
+    readers never see partial totals.
+
+    `progress(first_id, last_id)` is called after each pass, if given.
+    """
+    dialect = db.get_bind().dialect.name
+    db.execute(text("DROP TABLE IF EXISTS activity_rollups_rebuild"))
+    db.execute(text("""
+        CREATE TABLE activity_rollups_rebuild (
+            day TEXT NOT NULL,
+            action TEXT NOT NULL,
+            actor_user_id INTEGER NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, action, actor_user_id)
+        )
+    """))
+    db.commit()
+
+    count_into_staging = text(_ROLLUP_COUNT_RANGE.format(table="activity_rollups_rebuild"))
+    lo, hi = db.execute(text("SELECT MIN(id), MAX(id) FROM activity_log")).one()
+    db.commit()
+
+    rows = 0
+    if lo is not None:
+        start = lo
+        while start <= hi:
+            end = min(start + chunk_size, hi + 1)
+            res = db.execute(count_into_staging, {"start": start, "end": end})
+            db.commit()
+            rows += res.rowcount or 0
+            if progress:
+                progress(start, end - 1)
+            start = end
+
+    # Swap. Hold the write lock so the activity writer can't bump the live
+    # table between counting the newer rows and replacing it.
+    if dialect == "sqlite":
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect == "postgresql":
+        db.execute(text("LOCK TABLE activity_rollups IN EXCLUSIVE MODE"))
+    db.execute(count_into_staging, {"start": (hi or 0) + 1, "end": 2**62})
+    db.execute(text("DELETE FROM activity_rollups"))
+    db.execute(text("""
+        INSERT INTO activity_rollups (day, action, actor_user_id, count)
+        SELECT day, action, actor_user_id, count FROM activity_rollups_rebuild
+    """))
+    db.execute(text("DROP TABLE activity_rollups_rebuild"))
+    db.commit()
+    return rows
+
+
+class ActivityWriter(PeriodicWorker):
+    """
+    Background writer for activity_log.
+
+    log_activity() enqueues a record; a worker thread writes queued
+    records with one multi-row INSERT per batch, either when
+    `batch_size` records are waiting or every `interval_seconds`.
+    When the queue is full new records are dropped (and counted) rather
+    than blocking the request.
+    """
+
+    thread_name = "activity-writer"
+
+    def __init__(self, batch_size: int, interval_seconds: float, max_queue: int):
+        super().__init__(max(0.1, float(interval_seconds)))
+        self.batch_size = max(1, int(batch_size))
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._flush_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self.wake()
+
+    def flush(self) -> int:
+        """Write everything currently queued. Safe to call from any thread."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    return written
+                self._write(batch)
+                written += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    def tick(self) -> None:
+        self.flush()
+
+    def on_stop(self) -> None:
+        self.flush()
+
+    def _drain(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[dict]) -> None:
+        try:
+            with SessionLocal() as db:
+                db.execute(activity_log_table.insert().values(batch))
+                bump_rollups(db, batch)
+                db.commit()
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"[ACTIVITY_LOG] Batch of {len(batch)} failed: {e}")
+            return
+        self.written += len(batch)
+        self.batches += 1
+
+
+activity_writer = ActivityWriter(
+    batch_size=settings.activity_log_batch_size,
+    interval_seconds=settings.activity_log_flush_interval_seconds,
+    max_queue=settings.activity_log_queue_max,
+)
 
 
 def log_activity(
@@ -11,37 +239,41 @@ def log_activity(
     entity_id: int | None = None,
     details: dict | None = None,
 ):
-    try:
-        actor_user_id = None
-        actor_email = None
-
-        if request and hasattr(request.state, "user") and request.state.user:
-            actor_user_id = request.state.user.id
-            actor_email = request.state.user.email
-
-        db.execute(
-            text("""
-                INSERT INTO activity_log (
-                    timestamp,
-                    actor_user_id,
-                    actor_email,
-                    action,
-                    entity_type,
-                    entity_id,
-                    details
-                )
-                VALUES (:ts, :uid, :email, :action, :etype, :eid, :details)
-            """),
-            {
-                "ts": datetime.utcnow(),
-                "uid": actor_user_id,
-                "email": actor_email,
-                "action": action,
-                "etype": entity_type,
-                "eid": entity_id,
-                "details": json.dumps(details) if details else None,
-            },
-        )
-        db.commit()
-    except Exception as e:
-        print(f"[ACTIVITY_LOG] Failed: {e}")
+    with phase("activity"):
+        try:
+            record = _record(request, action, entity_type, entity_id, details)
+
+            if settings.activity_log_mode == "queued":
+                activity_writer.enqueue(record)
+                return
+
+            # "sync": write in the caller's session and commit straight away.
+            db.execute(activity_log_table.insert().values(record))
+            bump_rollups(db, [record])
+            db.commit()
+        except Exception as e:
+            print(f"[ACTIVITY_LOG] Failed: {e}")
+
+
+async def log_activity_async(
+    db,
+    request=None,
+    action: str = "",
+    entity_type: str | None = None,
+    entity_id: int | None = None,
+    details: dict | None = None,
+):
+    """log_activity() for handlers running on an AsyncSession."""
+    with phase("activity"):
+        try:
+            record = _record(request, action, entity_type, entity_id, details)
+
+            if settings.activity_log_mode == "queued":
+                activity_writer.enqueue(record)
+                return
+
+            await db.execute(activity_log_table.insert().values(record))
+            await db.execute(_ROLLUP_UPSERT, _rollup_params([record]))
+            await db.commit()
+        except Exception as e:
+            print(f"[ACTIVITY_LOG] Failed: {e}")
@@ -0,0 +1,267 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, text
+
+from .config import settings
+from .db import SessionLocal, engine
+from .migrations import file_lock
+from .periodic import PeriodicWorker
+
+
+ARCHIVE_NAME_RE = re.compile(r"^activity-(\d{4}-\d{2})\.jsonl\.gz$")
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+ARCHIVE_COLUMNS = (
+    "id",
+    "timestamp",
+    "actor_user_id",
+    "actor_email",
+    "action",
+    "entity_type",
+    "entity_id",
+    "details",
+)
+
+
+def archive_path(month: str) -> str:
+    if not MONTH_RE.match(month):
+        raise ValueError(f"Bad archive month: {month!r}")
+    return os.path.join(settings.activity_log_archive_dir, f"activity-{month}.jsonl.gz")
+
+
+def list_archives() -> list[dict]:
+    folder = settings.activity_log_archive_dir
+    if not os.path.isdir(folder):
+        return []
+    archives = []
+    for name in sorted(os.listdir(folder), reverse=True):
+        m = ARCHIVE_NAME_RE.match(name)
+        if m:
+            archives.append({"month": m.group(1), "size": os.path.getsize(os.path.join(folder, name))})
+    return archives
+
+
+def iter_archive(month: str, chunk_lines: int = 500):
+    """
+    Yield the decompressed JSONL of one archived month in chunks of lines,
+    so a large month is never held in memory.
+    """
+    with gzip.open(archive_path(month), "rt", encoding="utf-8") as f:
+        chunk = []
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+
+def _month_of(ts) -> str:
+    return str(ts)[:7]
+
+
+class _MonthAppender:
+    """
+    One run's rows for a month's archive, written as a single new gzip
+    member onto a copy of the archive and renamed over it by commit().
+    Until then the archive itself is untouched: a crash leaves only the
+    temp file, which the next run overwrites.
+    """
+
+    def __init__(self, month: str):
+        self.month = month
+        self.path = archive_path(month)
+        self.tmp = self.path + ".tmp"
+        if os.path.exists(self.path):
+            shutil.copyfile(self.path, self.tmp)
+        else:
+            open(self.tmp, "wb").close()
+        self._raw = open(self.tmp, "ab")
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self.ids: list = []
+
+    def write(self, row_id, line: str) -> None:
+        self._gz.write(line.encode("utf-8"))
+        self.ids.append(row_id)
+
+    def commit(self) -> None:
+        self._gz.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self.tmp, self.path)
+
+    def discard(self) -> None:
+        self._gz.close()
+        self._raw.close()
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+_PG_LOCK_KEY = "hashtext('familyhub.activity_retention')"
+
+
+class ActivityRetention(PeriodicWorker):
+    """
+    Moves activity_log rows older than `retention_days` into gzip JSONL
+    archives (one file per month) and deletes them from the live table.
+
+    Reads oldest-first in batches of `batch_size` and streams each month's
+    rows into one new gzip member (gzip readers treat the members as one
+    stream) on a temp copy of that month's archive. The copy is renamed
+    into place once the run has passed the month, and only then are its
+    rows deleted, `batch_size` per commit. So each archive is copied once
+    per run, and an interrupted run can at worst duplicate rows in the
+    archive, never lose or corrupt them.
+
+    Every worker runs this thread, but only one archives at a time: the
+    others find the lock taken (an flock in the archive directory, plus a
+    Postgres advisory lock when several hosts share the database) and skip
+    that run.
+    """
+
+    thread_name = "activity-retention"
+    tick_on_start = True
+
+    def __init__(self, retention_days: int, batch_size: int, interval_seconds: float):
+        super().__init__(max(60.0, float(interval_seconds)))
+        self.retention_days = int(retention_days)
+        self.batch_size = max(1, int(batch_size))
+
+        self.runs = 0
+        self.rows_archived = 0
+
+    def run_once(self) -> int:
+        if self.retention_days <= 0:
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        started = time.perf_counter()
+        archived = 0
+
+        os.makedirs(settings.activity_log_archive_dir, exist_ok=True)
+        lock_path = os.path.join(settings.activity_log_archive_dir, ".retention.lock")
+
+        try:
+            with file_lock(lock_path, blocking=False) as acquired:
+                if not acquired:
+                    print("[ACTIVITY_RETENTION] Another worker is archiving; skipped")
+                    return 0
+                with engine.connect() as lock_conn:
+                    if not self._try_db_lock(lock_conn):
+                        print("[ACTIVITY_RETENTION] Another host is archiving; skipped")
+                        return 0
+                    try:
+                        archived = self._archive(cutoff)
+                    finally:
+                        self._release_db_lock(lock_conn)
+        except Exception as e:
+            print(f"[ACTIVITY_RETENTION] Failed: {e}")
+
+        elapsed = time.perf_counter() - started
+        self.runs += 1
+        self.rows_archived += archived
+        print(f"[ACTIVITY_RETENTION] Archived {archived} row(s) older than {cutoff:%Y-%m-%d} in {elapsed * 1000:.1f} ms")
+        return archived
+
+    def _archive(self, cutoff: datetime) -> int:
+        archived = 0
+        columns = ", ".join(ARCHIVE_COLUMNS)
+        first_batch = text(f"""
+            SELECT {columns}
+            FROM activity_log
+            WHERE timestamp < :cutoff
+            ORDER BY timestamp, id
+            LIMIT :limit
+        """)
+        # Nothing is deleted until a month is archived, so page by key.
+        next_batch = text(f"""
+            SELECT {columns}
+            FROM activity_log
+            WHERE timestamp < :cutoff
+              AND (timestamp > :after_ts OR (timestamp = :after_ts AND id > :after_id))
+            ORDER BY timestamp, id
+            LIMIT :limit
+        """)
+
+        current: _MonthAppender | None = None
+        try:
+            with SessionLocal() as db:
+                params = {"cutoff": cutoff, "limit": self.batch_size}
+                stmt = first_batch
+                while not self._stop.is_set():
+                    rows = db.execute(stmt, params).fetchall()
+                    # End the read transaction; SQLite couldn't upgrade an
+                    # old snapshot to write the deletes later.
+                    db.commit()
+
+                    for r in rows:
+                        data = dict(r._mapping)
+                        month = _month_of(data["timestamp"])
+                        if current is None or current.month != month:
+                            if current is not None:
+                                archived += self._finish_month(db, current)
+                            current = _MonthAppender(month)
+                        current.write(data["id"], json.dumps(data, default=str) + "\n")
+
+                    if len(rows) < self.batch_size:
+                        break
+                    stmt = next_batch
+                    params.update(after_ts=rows[-1].timestamp, after_id=rows[-1].id)
+
+                if current is not None:
+                    month, current = current, None
+                    archived += self._finish_month(db, month)
+        except Exception as e:
+            if current is not None:
+                current.discard()
+            print(f"[ACTIVITY_RETENTION] Failed after {archived} row(s): {e}")
+        return archived
+
+    def _finish_month(self, db, month: _MonthAppender) -> int:
+        """Rename the month's archive into place, then delete its rows."""
+        delete_batch = text("DELETE FROM activity_log WHERE id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        )
+        month.commit()
+        for i in range(0, len(month.ids), self.batch_size):
+            db.execute(delete_batch, {"ids": month.ids[i : i + self.batch_size]})
+            db.commit()
+        return len(month.ids)
+
+    @staticmethod
+    def _try_db_lock(conn) -> bool:
+        if conn.dialect.name != "postgresql":
+            return True
+        acquired = conn.execute(text(f"SELECT pg_try_advisory_lock({_PG_LOCK_KEY})")).scalar()
+        conn.commit()
+        return bool(acquired)
+
+    @staticmethod
+    def _release_db_lock(conn) -> None:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"SELECT pg_advisory_unlock({_PG_LOCK_KEY})"))
+            conn.commit()
+
+    def start(self) -> None:
+        if self.retention_days > 0:
+            super().start()
+
+    def tick(self) -> None:
+        self.run_once()
+
+
+activity_retention = ActivityRetention(
+    retention_days=settings.activity_log_retention_days,
+    batch_size=settings.activity_log_retention_batch_size,
+    interval_seconds=settings.activity_log_retention_interval_seconds,
+)
@@ -12,6 +12,56 @@ class Settings(BaseSettings):
     # DB (SQLite by default, mounted to ./data in Docker)
     database_url: str = "sqlite:///./data/familyhub.db"
 
+    # Optional read-only database for GET pages (get_read_db). For Postgres
+    # point this at a replica. For SQLite leave it unset: a second engine on
+    # the same file is opened with PRAGMA query_only, which under WAL lets
+    # reads run alongside the single writer.
+    database_read_url: str | None = None
+
+    # Optional async engine (core/db_async.py) used by the async versions of
+    # the hottest routes (login, dashboard, shopping list, item toggle).
+    # Needs aiosqlite (SQLite) or asyncpg (Postgres). When async_database_url
+    # is unset it is derived from database_url.
+    async_db_enabled: bool = False
+    async_database_url: str | None = None
+
+    # Connection pool. Unset values fall back to per-dialect defaults in
+    # core/db.py (_pool_kwargs).
+    db_pool_size: int | None = None
+    db_max_overflow: int | None = None
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_recycle: int | None = None  # seconds; -1 disables
+    db_pool_pre_ping: bool | None = None
+    db_pool_slow_wait_ms: float = 100.0  # checkouts slower than this are counted as slow
+
+    # Per-request SQL counting (core/query_stats.py). Requests running at
+    # least sql_log_request_queries statements are logged. The N+1 guard
+    # looks for one statement shape repeated more than the threshold within a
+    # request: "off", "warn" (log it) or "raise" (fail the request; for dev
+    # and tests).
+    sql_instrumentation_enabled: bool = True
+    sql_log_request_queries: int = 50
+    sql_n_plus_one_mode: str = "off"
+    sql_n_plus_one_threshold: int = 5
+
+    # Server-Timing header on HTML responses (auth / db / render / activity).
+    server_timing_enabled: bool = False
+
+    # Apply migrations when a worker starts. Safe with several workers (they
+    # serialise on a lock); turn off when `python -m app.cli migrate` runs
+    # as a separate deploy step.
+    migrate_on_startup: bool = True
+
+    # SQLite PRAGMAs applied to every new connection (ignored for other databases).
+    # Set a value to "" to leave SQLite's default in place.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL; FULL is the SQLite default
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size: int = -20000  # negative = KiB, so ~20 MB per connection
+    sqlite_mmap_size: int = 128 * 1024 * 1024
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_foreign_keys: bool = False  # existing bulk deletes don't cascade, so off by default
+
     # Optional bootstrap admin. If set, app will ensure this admin exists on startup.
     bootstrap_admin_email: str | None = None
     bootstrap_admin_password: str | None = None
@@ -21,8 +71,83 @@ class Settings(BaseSettings):
     csrf_cookie: str = "fh_csrf"
     session_ttl_minutes: int = 60 * 24 * 14  # 14 days
 
+    # "db": opaque token looked up in the sessions table
+    # "signed": HMAC-signed stateless token; logouts are kept in revoked_tokens
+    #           (see core/signed_sessions.py)
+    session_backend: str = "db"
+
+    # Password hashing. Changing the scheme or cost takes effect for new
+    # hashes immediately; existing hashes are upgraded on the next login.
+    password_hash_scheme: str = "bcrypt"  # "bcrypt" or "argon2" (needs argon2-cffi)
+    password_bcrypt_rounds: int = 12
+    password_argon2_time_cost: int = 3
+    password_argon2_memory_cost: int = 65536  # KiB
+    password_argon2_parallelism: int = 2
+    password_hash_workers: int = 2  # max concurrent hash/verify operations on the async login path
+
+    # Login / MFA throttling (sliding window, in-memory)
+    auth_rate_limit_enabled: bool = True
+    auth_rate_limit_window_seconds: int = 15 * 60
+    auth_rate_limit_ip_attempts: int = 30
+    auth_rate_limit_account_attempts: int = 10
+    auth_rate_limit_max_keys: int = 10000
+
+    # In-process cache of session token -> user snapshot used by get_current_user.
+    # Entries are invalidated on logout / user changes; the TTL bounds staleness
+    # across multiple workers.
+    session_cache_enabled: bool = True
+    session_cache_ttl_seconds: int = 30
+    session_cache_max_entries: int = 1024
+
+    # How sessions.last_seen_at is maintained:
+    #   "write_behind" - buffer touches in memory, flush in one batched UPDATE
+    #   "sync"         - update + commit inside the request
+    #   "off"          - never update
+    session_touch_mode: str = "write_behind"
+    session_touch_window_seconds: int = 60  # skip touches for sessions seen this recently
+    session_touch_flush_interval_seconds: int = 15
+    session_touch_flush_max: int = 500
+
+    # Background removal of expired sessions and revoked signed tokens
+    session_reaper_enabled: bool = True
+    session_reaper_interval_seconds: int = 60 * 60
+    session_reaper_batch_size: int = 500
+
+    # Activity log writes:
+    #   "queued" - enqueue and let a background thread batch-insert
+    #   "sync"   - insert + commit inside the request (useful for tests)
+    activity_log_mode: str = "queued"
+    activity_log_batch_size: int = 200
+    activity_log_flush_interval_seconds: float = 2.0
+    activity_log_queue_max: int = 10000
+
+    # Rows older than this are moved to gzip JSONL archives (one per month)
+    # and removed from the live table. 0 keeps everything.
+    activity_log_retention_days: int = 180
+    activity_log_retention_batch_size: int = 1000
+    activity_log_retention_interval_seconds: int = 6 * 60 * 60
+    activity_log_archive_dir: str = "./data/activity_archive"
+
+    # Shopping: most lines accepted by one bulk paste-in add
+    shopping_bulk_add_max_items: int = 200
+
+    # Live shopping lists (core/list_events.py): open list pages get item
+    # changes over Server-Sent Events. A client that falls more than
+    # queue_max events behind is told to reload instead. Streams end after
+    # max_stream_seconds and the browser reconnects (replaying anything it
+    # missed), so open pages never hold up a restart for longer than that.
+    shopping_events_enabled: bool = True
+    shopping_events_heartbeat_seconds: float = 20.0
+    shopping_events_max_stream_seconds: float = 60.0
+    shopping_events_queue_max: int = 100
+    shopping_events_max_subscribers: int = 1000
+
     # App
     behind_proxy: bool = True  # set false if not using a reverse proxy
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # The client address is the entry the outermost of them appended;
+    # anything to its left was sent by the client and can't be trusted.
+    trusted_proxy_count: int = 1
 
 
 settings = Settings()
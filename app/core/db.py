@@ -1,5 +1,11 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from .config import settings
 
@@ -14,8 +20,171 @@ def _connect_args(url: str):
     return {}
 
 
-engine = create_engine(settings.database_url, connect_args=_connect_args(settings.database_url))
+class PoolMetrics:
+    """Checkout wait times and overflow / timeout counts for the pool."""
+
+    def __init__(self, slow_wait_ms: float):
+        self.slow_wait = slow_wait_ms / 1000.0
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_waits = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+
+    def record(self, waited: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            if waited >= self.slow_wait:
+                self.slow_waits += 1
+            if overflowed:
+                self.overflow_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(1000 * self.wait_total / self.checkouts, 2) if self.checkouts else 0,
+                "max_wait_ms": round(1000 * self.wait_max, 2),
+                "slow_waits": self.slow_waits,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                {
+                    "size": pool.size(),
+                    "in_use": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(0, pool.overflow()),
+                }
+            )
+        return stats
+
+
+pool_metrics = PoolMetrics(settings.db_pool_slow_wait_ms)
+read_pool_metrics = PoolMetrics(settings.db_pool_slow_wait_ms)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - started, self.checkedout() > self.size())
+        return conn
+
+
+class InstrumentedReadQueuePool(InstrumentedQueuePool):
+    metrics = read_pool_metrics
+
+
+def _pool_kwargs(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """
+    Per-dialect pool defaults, overridable from settings.
+
+    - in-memory SQLite: one shared connection (StaticPool), otherwise each
+      connection would see its own empty database
+    - file SQLite: a QueuePool sized around the request threadpool; there is
+      only one writer at a time anyway, and connections are cheap to hold
+    - everything else (Postgres): a modest QueuePool with pre-ping and
+      recycling, so connections dropped by the server are replaced
+    """
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        if u.database in (None, "", ":memory:"):
+            return {"poolclass": StaticPool}
+        defaults = {"pool_size": 10, "max_overflow": 10, "pool_recycle": -1, "pool_pre_ping": False}
+    else:
+        defaults = {"pool_size": 5, "max_overflow": 10, "pool_recycle": 1800, "pool_pre_ping": True}
+
+    overrides = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    kwargs = {**defaults, **{k: v for k, v in overrides.items() if v is not None}}
+    kwargs["pool_timeout"] = settings.db_pool_timeout
+    kwargs["poolclass"] = poolclass
+    return kwargs
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMAs from settings, in the order they are applied."""
+    pragmas = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": settings.sqlite_temp_store,
+        "foreign_keys": "ON" if settings.sqlite_foreign_keys else "OFF",
+    }
+    return {k: v for k, v in pragmas.items() if v != ""}
+
+
+def _apply_sqlite_pragmas(dbapi_conn, connection_record):
+    cur = dbapi_conn.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cur.execute(f"PRAGMA {name}={value}")
+    finally:
+        cur.close()
+
+
+def _set_query_only(dbapi_conn, connection_record):
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute("PRAGMA query_only=ON")
+    finally:
+        cur.close()
+
+
+engine = create_engine(
+    settings.database_url,
+    connect_args=_connect_args(settings.database_url),
+    **_pool_kwargs(settings.database_url),
+)
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+
+def _build_read_engine():
+    if settings.database_read_url:
+        url = settings.database_read_url
+    elif engine.dialect.name == "sqlite" and not isinstance(engine.pool, StaticPool):
+        url = settings.database_url
+    else:
+        # No replica configured (or in-memory SQLite): reads share the writer.
+        return engine
+
+    read = create_engine(url, connect_args=_connect_args(url), **_pool_kwargs(url, InstrumentedReadQueuePool))
+    if read.dialect.name == "sqlite":
+        event.listen(read, "connect", _apply_sqlite_pragmas)
+        event.listen(read, "connect", _set_query_only)
+    return read
+
+
+read_engine = _build_read_engine()
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
 
 
 def get_db():
@@ -24,3 +193,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for handlers that only read. Writes through it will fail."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,55 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .config import settings
+from .db import _apply_sqlite_pragmas, _pool_kwargs
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """Swap the sync driver in `url` for its async counterpart."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend!r}; set async_database_url")
+    return u.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _build_async_engine():
+    if not settings.async_db_enabled:
+        return None
+    url = settings.async_database_url or async_url(settings.database_url)
+    # Same pool settings as the sync engine; the poolclass matters because
+    # aiosqlite would otherwise default to NullPool for file databases.
+    eng = create_async_engine(url, **_pool_kwargs(url, AsyncAdaptedQueuePool))
+    if eng.dialect.name == "sqlite":
+        # Same PRAGMAs as the sync engine; the listener sees the adapted
+        # DBAPI connection, which has the usual cursor() interface.
+        event.listen(eng.sync_engine, "connect", _apply_sqlite_pragmas)
+    return eng
+
+
+async_engine = _build_async_engine()
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+    if async_engine is not None
+    else None
+)
+
+
+async def get_async_db():
+    """
+    AsyncSession dependency. expire_on_commit is off because an expired
+    attribute would need lazy IO to reload, which AsyncSession can't do
+    implicitly.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
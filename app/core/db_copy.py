@@ -0,0 +1,93 @@
+import time
+
+from sqlalchemy import Boolean, Integer, MetaData, create_engine, func, select, text
+
+from .migrations import run_migrations
+
+
+# Rebuilt by the target's own migration run rather than copied.
+SKIP_TABLES = {"schema_migrations"}
+
+
+def _coerce_row(row, bool_columns: set[str]) -> dict:
+    data = dict(row._mapping)
+    for name in bool_columns:
+        if data.get(name) is not None:
+            # SQLite stores booleans (and the INTEGER flags from the SQL
+            # migrations) as 0/1; Postgres wants real booleans.
+            data[name] = bool(data[name])
+    return data
+
+
+def _reset_sequences(conn, tables) -> None:
+    for table in tables:
+        pk = list(table.primary_key.columns)
+        if len(pk) != 1 or not isinstance(pk[0].type, Integer):
+            continue
+        conn.execute(
+            text(f"""
+                SELECT setval(
+                    pg_get_serial_sequence(:table, :col),
+                    COALESCE((SELECT MAX({pk[0].name}) FROM {table.name}), 0) + 1,
+                    false
+                )
+            """),
+            {"table": table.name, "col": pk[0].name},
+        )
+
+
+def copy_database(source_url: str, target_url: str, metadata, batch_size: int = 1000) -> dict[str, int]:
+    """
+    One-shot copy of every table from `source_url` (normally the SQLite
+    file) into an empty `target_url` (normally Postgres).
+
+    The target schema is created with the normal migration runner first.
+    Tables are copied parent-first; each is streamed from a server-side
+    cursor and inserted `batch_size` rows at a time, one commit per batch,
+    so memory stays flat. Returns rows copied per table.
+    """
+    source = create_engine(source_url)
+    target = create_engine(target_url)
+
+    run_migrations(target, metadata)
+
+    src_meta = MetaData()
+    src_meta.reflect(bind=source)
+    dst_meta = MetaData()
+    dst_meta.reflect(bind=target)
+
+    tables = [t for t in dst_meta.sorted_tables if t.name not in SKIP_TABLES and t.name in src_meta.tables]
+
+    with target.connect() as conn:
+        for table in tables:
+            if conn.execute(select(func.count()).select_from(table)).scalar():
+                raise RuntimeError(f"Target table {table.name} is not empty; refusing to copy")
+
+    copied: dict[str, int] = {}
+    for table in tables:
+        started = time.perf_counter()
+        src_table = src_meta.tables[table.name]
+        columns = [c.name for c in table.columns if c.name in src_table.columns]
+        bool_columns = {c.name for c in table.columns if isinstance(c.type, Boolean)}
+
+        rows = 0
+        with source.connect() as src, target.connect() as dst:
+            result = src.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(*[src_table.c[name] for name in columns]).order_by(*src_table.primary_key.columns)
+            )
+            for chunk in result.partitions(batch_size):
+                dst.execute(table.insert(), [_coerce_row(r, bool_columns) for r in chunk])
+                dst.commit()
+                rows += len(chunk)
+                print(f"[DB_COPY] {table.name}: {rows} row(s)")
+
+        copied[table.name] = rows
+        print(f"[DB_COPY] Copied {table.name} ({rows} rows) in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if target.dialect.name == "postgresql":
+        with target.begin() as conn:
+            _reset_sequences(conn, tables)
+
+    source.dispose()
+    target.dispose()
+    return copied
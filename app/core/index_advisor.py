@@ -0,0 +1,239 @@
+"""
+Query-plan based index advisor.
+
+Runs the app's real read queries (the crud functions below, with sample
+arguments) on a connection that is rolled back afterwards, captures the
+SQL they emit, and EXPLAINs each statement. Full table scans and temp
+B-tree sorts are flagged, and the index each query wants is suggested as
+a migration when it doesn't already exist.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .. import crud
+from .migrations import MIGRATIONS_DIR, migration_files
+from .query_stats import untracked
+
+
+@dataclass
+class AdvisedQuery:
+    name: str
+    run: callable  # run(db) -> calls the crud function
+    table: str  # table the suggested index goes on
+    columns: tuple[str, ...]  # index columns, "col DESC" allowed
+
+
+@dataclass
+class Finding:
+    query: AdvisedQuery
+    statements: list[str] = field(default_factory=list)
+    plan: list[str] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+    index_exists: bool = False
+
+    @property
+    def suggestion(self) -> str | None:
+        if not self.problems or self.index_exists:
+            return None
+        return create_index_sql(self.query.table, self.query.columns)
+
+
+def _today():
+    return date.today()
+
+
+REGISTRY = [
+    AdvisedQuery(
+        "shopping.list_items",
+        lambda db: crud.list_items(db, 1),
+        "shopping_items", ("list_id", "is_checked", "created_at DESC"),
+    ),
+    AdvisedQuery(
+        "shopping.shopping_list_view",
+        lambda db: crud.shopping_list_view(db, 1, 1),
+        "shopping_items", ("list_id", "is_checked", "created_at DESC"),
+    ),
+    AdvisedQuery(
+        "shopping.count_open_items_by_list",
+        lambda db: crud.count_open_items_by_list(db, [1, 2]),
+        "shopping_items", ("list_id", "is_checked", "created_at DESC"),
+    ),
+    AdvisedQuery(
+        "shopping.list_lists_with_counts",
+        lambda db: crud.list_lists_with_counts(db, 1),
+        "shopping_lists", ("household_id", "is_archived", "created_at"),
+    ),
+    AdvisedQuery(
+        "shopping.list_shops",
+        lambda db: crud.list_shops(db, 1),
+        "shopping_shops", ("household_id", "name"),
+    ),
+    AdvisedQuery(
+        "shopping_categories.list_categories",
+        lambda db: crud.list_categories(db, 1),
+        "shopping_categories", ("household_id", "name"),
+    ),
+    AdvisedQuery(
+        "chores.list_chores",
+        lambda db: crud.list_chores(db, 1),
+        "chores", ("household_id", "is_active", "created_at"),
+    ),
+    AdvisedQuery(
+        "chores.last_completed_by_chore",
+        lambda db: crud.last_completed_by_chore(db, [1, 2]),
+        "chore_completions", ("chore_id", "completed_on DESC"),
+    ),
+    AdvisedQuery(
+        "calendar.list_upcoming_events",
+        lambda db: crud.list_upcoming_events(db, 1, datetime.utcnow()),
+        "calendar_events", ("household_id", "start_at"),
+    ),
+    AdvisedQuery(
+        "mealplan.list_meals_in_range",
+        lambda db: crud.list_meals_in_range(db, 1, _today(), _today() + timedelta(days=6)),
+        "meal_plan_entries", ("household_id", "meal_date"),
+    ),
+    AdvisedQuery(
+        "users.get_user_by_email",
+        lambda db: crud.get_user_by_email(db, "advisor@example.invalid"),
+        "users", ("email",),
+    ),
+    AdvisedQuery(
+        "sessions.get_session_by_token",
+        lambda db: crud.get_session_by_token(db, "advisor-token"),
+        "sessions", ("token",),
+    ),
+    AdvisedQuery(
+        "activity.list_activity",
+        lambda db: crud.list_activity(db, limit=100),
+        "activity_log", ("timestamp",),
+    ),
+    AdvisedQuery(
+        "activity.list_activity (action filter)",
+        lambda db: crud.list_activity(db, action="auth.login.success", limit=100),
+        "activity_log", ("action", "timestamp"),
+    ),
+    AdvisedQuery(
+        "activity.rollup_daily",
+        lambda db: crud.rollup_daily(db, action_prefix="auth.", since=_today() - timedelta(days=30)),
+        "activity_rollups", ("action", "day"),
+    ),
+]
+
+
+def index_name(table: str, columns) -> str:
+    return "ix_" + table + "_" + "_".join(c.split()[0] for c in columns)
+
+
+def create_index_sql(table: str, columns) -> str:
+    return f"CREATE INDEX IF NOT EXISTS {index_name(table, columns)}\n    ON {table} ({', '.join(columns)});"
+
+
+def _has_index(insp, table: str, columns) -> bool:
+    """True when an existing index starts with the wanted columns."""
+    wanted = [c.split()[0] for c in columns]
+    if not insp.has_table(table):
+        return False
+    indexes = list(insp.get_indexes(table))
+    indexes += [{"column_names": uc["column_names"]} for uc in insp.get_unique_constraints(table)]
+    return any(list(ix["column_names"][: len(wanted)]) == wanted for ix in indexes)
+
+
+def _explain_sqlite(conn, statement, parameters) -> tuple[list[str], list[str]]:
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    plan, problems = [], []
+    for row in rows:
+        detail = row[-1]
+        plan.append(detail)
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            problems.append(f"full scan: {detail}")
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(f"temp b-tree sort: {detail}")
+    return plan, problems
+
+
+def _explain_postgres(conn, statement, parameters) -> tuple[list[str], list[str]]:
+    raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    doc = json.loads(raw) if isinstance(raw, str) else raw
+    plan, problems = [], []
+
+    def walk(node, depth=0):
+        kind = node.get("Node Type", "")
+        relation = node.get("Relation Name", "")
+        plan.append(f"{'  ' * depth}{kind} {relation}".rstrip())
+        if kind == "Seq Scan":
+            problems.append(f"full scan: Seq Scan on {relation}")
+        elif kind == "Sort":
+            problems.append(f"sort: {', '.join(node.get('Sort Key', []))}")
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(doc[0]["Plan"])
+    return plan, problems
+
+
+def analyse(engine) -> list[Finding]:
+    """
+    EXPLAIN every registered query. Nothing is written: the connection is
+    rolled back. Its statements (a reflection query per entry, similar
+    EXPLAINs) aren't counted against the request's N+1 limit.
+    """
+    explain = _explain_postgres if engine.dialect.name == "postgresql" else _explain_sqlite
+    findings = []
+
+    with untracked(), engine.connect() as conn:
+        insp = inspect(conn)
+        captured: list[tuple[str, object]] = []
+
+        def capture(conn_, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        db = Session(bind=conn)
+        try:
+            for query in REGISTRY:
+                captured.clear()
+                event.listen(conn, "before_cursor_execute", capture)
+                try:
+                    query.run(db)
+                finally:
+                    event.remove(conn, "before_cursor_execute", capture)
+
+                finding = Finding(query=query, index_exists=_has_index(insp, query.table, query.columns))
+                for statement, parameters in list(captured):
+                    plan, problems = explain(conn, statement, parameters)
+                    finding.statements.append(" ".join(statement.split()))
+                    finding.plan.extend(plan)
+                    finding.problems.extend(problems)
+                findings.append(finding)
+        finally:
+            db.close()
+            conn.rollback()
+
+    return findings
+
+
+def suggested_migration(findings: list[Finding]) -> str:
+    """SQL for the missing indexes, one per distinct (table, columns)."""
+    seen = {}
+    for f in findings:
+        if f.suggestion:
+            seen.setdefault((f.query.table, f.query.columns), (f.suggestion, []))[1].append(f.query.name)
+    if not seen:
+        return ""
+    lines = ["-- Suggested by the index advisor (python -m app.cli index-advisor)", ""]
+    for sql, names in seen.values():
+        lines.append(f"-- {', '.join(names)}")
+        lines.append(sql)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def next_migration_path(dialect: str, name: str = "advised_indexes") -> str:
+    versions = [int(v) for v, _, _ in migration_files(dialect) if v.isdigit()]
+    return os.path.join(MIGRATIONS_DIR, f"{max(versions, default=0) + 1:03d}_{name}.sql")
@@ -0,0 +1,201 @@
+"""
+In-process pub/sub for live shopping lists.
+
+The crud item paths publish a small delta per change ({"type": "toggled",
+"id": 3, "is_checked": true} and so on) after their commit; the
+/shopping/{list_id}/events SSE stream forwards it to every open page on
+that list, which patches its DOM instead of reloading.
+
+publish() is safe from any thread (sync routes run in the threadpool). A
+subscriber is just a bounded asyncio.Queue awaited by its stream, so idle
+clients cost no threads. When a slow client's queue fills up its backlog
+is dropped and replaced by one {"type": "resync"}, which makes the page
+reload.
+
+Streams end after settings.shopping_events_max_stream_seconds, so open
+pages never hold up a server restart for long; EventSource reconnects by
+itself and sends the last event id it saw. Each list keeps its last few
+events, numbered, so the new stream replays what was missed in between,
+or sends "resync" when it can't (too old, or ids from another process).
+
+Events only reach clients connected to the same worker process. The
+toggle / delete routes also return their event to the fetch that posted
+it, so a page always sees its own changes.
+"""
+import asyncio
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+from .config import settings
+
+
+RESYNC = {"type": "resync"}
+
+
+class Subscriber:
+    __slots__ = ("list_id", "queue", "loop")
+
+    def __init__(self, list_id: int, max_queue: int, loop: asyncio.AbstractEventLoop):
+        self.list_id = list_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.loop = loop
+
+    def put(self, seq: int | None, event: dict) -> bool:
+        """Runs on the event loop. False when the backlog had to be dropped."""
+        try:
+            self.queue.put_nowait((seq, event))
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((None, RESYNC))
+            return False
+
+
+class ListEventHub:
+    def __init__(self, max_queue: int, max_subscribers: int, history: int = 50, max_lists: int = 1000):
+        self.max_queue = max(1, int(max_queue))
+        self.max_subscribers = max(1, int(max_subscribers))
+        self.history = max(1, int(history))
+        self.max_lists = max(1, int(max_lists))
+        # Prefix for event ids, so ids from before a restart or from another
+        # worker are recognised and answered with a resync.
+        self.epoch = secrets.token_hex(4)
+
+        self._subs: dict[int, set[Subscriber]] = {}
+        self._seq: dict[int, int] = {}
+        self._recent: OrderedDict[int, deque] = OrderedDict()  # list_id -> (seq, event), LRU
+        self._count = 0
+        self._lock = threading.Lock()
+
+        self.published = 0
+        self.delivered = 0
+        self.replayed = 0
+        self.overflows = 0
+        self.rejected = 0
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def subscribe(self, list_id: int, last_event_id: str | None = None) -> Subscriber | None:
+        """
+        Call from the event loop. Events after `last_event_id` (from the
+        client's Last-Event-ID header) are queued first. None when the
+        subscriber limit is reached.
+        """
+        sub = Subscriber(list_id, self.max_queue, asyncio.get_running_loop())
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            self._subs.setdefault(list_id, set()).add(sub)
+            self._count += 1
+            if last_event_id:
+                # Under the lock: nothing can be numbered between the replay
+                # and this subscriber joining the delivery set.
+                for seq, event in self._missed(list_id, last_event_id):
+                    sub.put(seq, event)
+                    self.replayed += 1
+        return sub
+
+    def _missed(self, list_id: int, last_event_id: str) -> list:
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return [(None, RESYNC)]
+        last = int(seq)
+        current = self._seq.get(list_id, 0)
+        if last > current:
+            return [(None, RESYNC)]
+        recent = self._recent.get(list_id) or deque()
+        if last < current and (not recent or recent[0][0] > last + 1):
+            return [(None, RESYNC)]
+        return [(s, e) for s, e in recent if s > last]
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.list_id)
+            if not subs or sub not in subs:
+                return
+            subs.discard(sub)
+            self._count -= 1
+            if not subs:
+                del self._subs[sub.list_id]
+
+    def publish(self, list_id: int, event: dict) -> None:
+        with self._lock:
+            seq = self._seq.get(list_id, 0) + 1
+            self._seq[list_id] = seq
+            recent = self._recent.get(list_id)
+            if recent is None:
+                recent = self._recent[list_id] = deque(maxlen=self.history)
+                if len(self._recent) > self.max_lists:
+                    evicted, _ = self._recent.popitem(last=False)
+                    self._seq.pop(evicted, None)
+            else:
+                self._recent.move_to_end(list_id)
+            recent.append((seq, event))
+            subs = list(self._subs.get(list_id, ()))
+
+        self.published += 1
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(self._deliver, sub, seq, event)
+            except RuntimeError:
+                # Loop already closed (shutdown); the stream is gone too.
+                self.unsubscribe(sub)
+
+    def _deliver(self, sub: Subscriber, seq: int, event: dict) -> None:
+        if sub.put(seq, event):
+            self.delivered += 1
+        else:
+            self.overflows += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "lists_watched": len(self._subs),
+            "lists_with_history": len(self._recent),
+            "published": self.published,
+            "delivered": self.delivered,
+            "replayed": self.replayed,
+            "overflows": self.overflows,
+            "rejected": self.rejected,
+        }
+
+
+list_events = ListEventHub(
+    max_queue=settings.shopping_events_queue_max,
+    max_subscribers=settings.shopping_events_max_subscribers,
+)
+
+
+async def sse_stream(sub: Subscriber, heartbeat_seconds: float, max_seconds: float):
+    """
+    Server-Sent Events for one subscriber: a retry hint, then one event
+    (with its id) per change, and a comment line as heartbeat whenever the
+    list has been quiet for `heartbeat_seconds`. Ends after `max_seconds`
+    so the client reconnects; unsubscribes when the stream ends or the
+    client goes.
+    """
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield "retry: 1000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                seq, event = await asyncio.wait_for(sub.queue.get(), timeout=min(heartbeat_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            data = json.dumps(event, separators=(",", ":"))
+            if seq is None:
+                yield f"data: {data}\n\n"
+            else:
+                yield f"id: {list_events.event_id(seq)}\ndata: {data}\n\n"
+    finally:
+        list_events.unsubscribe(sub)
@@ -1,59 +1,278 @@
+import hashlib
 import os
+import sqlite3
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, Text, inspect, text
 
 
 MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "migrations")
 
+# Dialects that may have their own variant of a migration, named
+# NNN_name.<dialect>.sql next to the portable NNN_name.sql.
+DIALECTS = ("sqlite", "postgresql")
 
-def run_migrations(db: Session):
-    # Ensure migrations table exists
-    db.execute(text("""
-        CREATE TABLE IF NOT EXISTS schema_migrations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            version TEXT NOT NULL UNIQUE,
-            name TEXT NOT NULL,
-            applied_at DATETIME NOT NULL
-        )
-    """))
-    db.commit()
-
-    applied = {
-        row[0]
-        for row in db.execute(text("SELECT version FROM schema_migrations")).fetchall()
-    }
-
-    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
-
-    for filename in files:
-        version = filename.split("_")[0]
-        if version in applied:
-            continue
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("version", Text, nullable=False, unique=True),
+    Column("name", Text, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("checksum", Text),
+)
+
+# schema_migrations row holding a fingerprint of every migration file plus
+# the ORM schema. When it matches, startup is one indexed SELECT.
+HEAD_VERSION = "head"
+
+
+def migration_files(dialect: str) -> list[tuple[str, str, str]]:
+    """
+    (version, filename, sql) for each migration, in order. Where a
+    NNN_name.<dialect>.sql variant exists it replaces NNN_name.sql;
+    other dialects' variants are ignored.
+    """
+    chosen: dict[str, str] = {}
+    for filename in sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql")):
+        stem = filename[: -len(".sql")]
+        base, _, suffix = stem.rpartition(".")
+        if base and suffix in DIALECTS:
+            if suffix == dialect:
+                chosen[base.split("_")[0]] = filename
+        else:
+            chosen.setdefault(stem.split("_")[0], filename)
+
+    files = []
+    for version in sorted(chosen):
+        with open(os.path.join(MIGRATIONS_DIR, chosen[version]), "r", encoding="utf-8") as f:
+            files.append((version, chosen[version], f.read()))
+    return files
+
+
+def checksum(sql: str) -> str:
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+def _orm_fingerprint(metadata) -> str:
+    parts = []
+    for table in metadata.sorted_tables:
+        for col in table.columns:
+            parts.append(f"{table.name}.{col.name}:{col.type!r}:{col.nullable}")
+        for idx in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"{table.name}#{idx.name}")
+    parts.extend(f"{t}.{c}:{ddl}" for t, c, ddl in ADDITIVE_COLUMNS)
+    return checksum("\n".join(parts))
+
+
+def schema_fingerprint(files, metadata) -> str:
+    return checksum("\n".join([f"{v}:{checksum(sql)}" for v, _, sql in files] + [_orm_fingerprint(metadata)]))
+
+
+def _only_comments(chunk: str) -> bool:
+    return all(not line.strip() or line.strip().startswith("--") for line in chunk.splitlines())
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a script into single statements (trigger bodies stay whole)."""
+    statements = []
+    buf = ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if not _only_comments(buf.rstrip().rstrip(";")):
+                statements.append(buf.strip())
+            buf = ""
+    if not _only_comments(buf):
+        statements.append(buf.strip())
+    return statements
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    Exclusive flock on `path` for the duration of the block. Yields True
+    once held; with blocking=False yields False straight away when another
+    process holds it. Where fcntl is unavailable (Windows, single-process
+    dev setups only) it yields True without locking.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield True
+        return
+
+    with open(path, "a") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _migration_lock(engine):
+    """
+    Cross-process lock around the slow path, so several workers starting
+    at once apply migrations exactly once. SQLite uses an flock on a file
+    next to the database; Postgres takes an advisory lock in the
+    transaction itself (see _begin).
+    """
+    path = None
+    if engine.dialect.name == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+        path = os.path.abspath(engine.url.database) + ".migrate.lock"
+    if path is None:
+        yield
+        return
+
+    with file_lock(path):
+        yield
+
+
+def _begin(conn) -> None:
+    if conn.dialect.name == "sqlite":
+        # pysqlite doesn't open a transaction before DDL on its own; start
+        # one explicitly so a failed migration leaves nothing behind.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('familyhub.migrations'))"))
 
-        print(f"[MIGRATION] Applying {filename}")
-        path = os.path.join(MIGRATIONS_DIR, filename)
-        with open(path, "r", encoding="utf-8") as f:
-            sql = f.read()
-
-        # 🔧 SQLite requires executescript for multi-statement SQL
-        conn = db.connection().connection
-        conn.executescript(sql)
-
-        db.execute(
-            text("""
-                INSERT INTO schema_migrations (version, name, applied_at)
-                VALUES (:v, :n, :t)
-            """),
-            {
-                "v": version,
-                "n": filename,
-                "t": datetime.utcnow(),
-            },
-        )
-        db.commit()
-
-        print(f"[MIGRATION] Applied {filename}")
-
-    if not files or len(applied) == len(files):
-        print("[MIGRATION] Database schema up to date")
+
+def _read_head(engine) -> str | None:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT checksum FROM schema_migrations WHERE version = :v"),
+                {"v": HEAD_VERSION},
+            ).scalar()
+    except Exception:
+        # fresh database, or schema_migrations from before checksums
+        return None
+
+
+def _ensure_migrations_table(conn) -> None:
+    schema_migrations.create(conn, checkfirst=True)
+    cols = {c["name"] for c in inspect(conn).get_columns("schema_migrations")}
+    if "checksum" not in cols:
+        conn.execute(text("ALTER TABLE schema_migrations ADD COLUMN checksum TEXT"))
+
+
+def _record(conn, version: str, name: str, digest: str) -> None:
+    conn.execute(
+        text("""
+            INSERT INTO schema_migrations (version, name, applied_at, checksum)
+            VALUES (:v, :n, :t, :c)
+        """),
+        {"v": version, "n": name, "t": datetime.utcnow(), "c": digest},
+    )
+
+
+def pending_migrations(engine) -> list[str]:
+    """Filenames not yet applied (for `python -m app.cli migrate --check`)."""
+    try:
+        with engine.connect() as conn:
+            applied = {r[0] for r in conn.execute(text("SELECT version FROM schema_migrations"))}
+    except Exception:
+        applied = set()
+    return [name for version, name, _ in migration_files(engine.dialect.name) if version not in applied]
+
+
+def run_migrations(engine, metadata) -> bool:
+    """
+    Bring the schema up to date: create_all and ensure_columns for the ORM
+    tables, then pending SQL migrations. Returns True when anything had
+    to run.
+
+    Fast path: if the stored fingerprint matches the migration files and
+    models on disk, return after a single indexed SELECT. Otherwise, under
+    a cross-process lock and in one transaction, verify the checksums of
+    applied migrations, apply the rest and store the new fingerprint.
+    """
+    started = time.perf_counter()
+    files = migration_files(engine.dialect.name)
+    fingerprint = schema_fingerprint(files, metadata)
+
+    if _read_head(engine) == fingerprint:
+        print(f"[MIGRATION] Database schema up to date ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return False
+
+    with _migration_lock(engine):
+        with engine.connect() as conn:
+            _begin(conn)
+            try:
+                _ensure_migrations_table(conn)
+                applied = {
+                    row.version: row.checksum
+                    for row in conn.execute(text("SELECT version, checksum FROM schema_migrations"))
+                }
+
+                # Another worker may have finished while we waited for the lock.
+                if applied.get(HEAD_VERSION) == fingerprint:
+                    conn.rollback()
+                    print("[MIGRATION] Database schema up to date")
+                    return False
+
+                # ORM tables first: later migrations may index them.
+                metadata.create_all(bind=conn)
+                ensure_columns(conn)
+
+                for version, filename, sql in files:
+                    digest = checksum(sql)
+                    if version in applied:
+                        stored = applied[version]
+                        if stored is None:
+                            conn.execute(
+                                text("UPDATE schema_migrations SET checksum = :c WHERE version = :v"),
+                                {"c": digest, "v": version},
+                            )
+                        elif stored != digest:
+                            raise RuntimeError(
+                                f"Migration {filename} was changed after it was applied "
+                                f"(checksum {stored[:12]} != {digest[:12]}); add a new migration instead"
+                            )
+                        continue
+
+                    print(f"[MIGRATION] Applying {filename}")
+                    for stmt in split_statements(sql):
+                        conn.execute(text(stmt))
+                    _record(conn, version, filename, digest)
+                    print(f"[MIGRATION] Applied {filename}")
+
+                conn.execute(text("DELETE FROM schema_migrations WHERE version = :v"), {"v": HEAD_VERSION})
+                _record(conn, HEAD_VERSION, "schema fingerprint", fingerprint)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    print(f"[MIGRATION] Schema migrated in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return True
+
+
+# Columns added to ORM-managed tables after they were first created.
+# create_all() won't alter existing tables, so these are checked by name and
+# added when missing. Runs after create_all, so fresh databases already
+# have them.
+ADDITIVE_COLUMNS = [
+    ("users", "token_generation", "INTEGER NOT NULL DEFAULT 0"),
+    ("shopping_lists", "open_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("shopping_lists", "total_count", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def ensure_columns(conn):
+    insp = inspect(conn)
+    for table, column, ddl in ADDITIVE_COLUMNS:
+        if not insp.has_table(table):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table)}
+        if column in existing:
+            continue
+        print(f"[MIGRATION] Adding column {table}.{column}")
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
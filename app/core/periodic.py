@@ -0,0 +1,57 @@
+import threading
+
+
+class PeriodicWorker:
+    """
+    A daemon thread that calls tick() every `interval_seconds`, or sooner
+    after wake(). Base for the touch flusher, activity writer, session
+    reaper and activity retention.
+
+    stop() wakes the thread, waits up to `stop_timeout` for the tick in
+    progress, then calls on_stop() (a final flush, for the buffers).
+    """
+
+    thread_name = "periodic-worker"
+    tick_on_start = False  # first tick straight away instead of after one interval
+    stop_timeout = 10.0
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = float(interval_seconds)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def tick(self) -> None:
+        raise NotImplementedError
+
+    def on_stop(self) -> None:
+        pass
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.stop_timeout)
+            self._thread = None
+        self.on_stop()
+
+    def _run(self) -> None:
+        if self.tick_on_start:
+            self.tick()
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.tick()
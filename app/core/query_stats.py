@@ -0,0 +1,188 @@
+"""
+Per-request SQL instrumentation.
+
+Engine-level before/after_cursor_execute hooks time every statement and
+charge it to the current request's RequestQueries (carried in a
+contextvar, which FastAPI copies into the threadpool for sync handlers).
+QueryStatsMiddleware opens one per request, logs heavy requests and keeps
+per-route totals for the diagnostics page.
+
+N+1 guard: when the same statement shape runs more than
+settings.sql_n_plus_one_threshold times in one request, "warn" logs it and
+"raise" fails the request with NPlusOneError (use that in tests / dev).
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+_IN_LIST_RE = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)")
+_WS_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Whitespace-collapsed statement with IN (?, ?, ...) lists folded to one."""
+    return _IN_LIST_RE.sub("(?)", _WS_RE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.db_time += elapsed
+            self.shapes[shape] += 1
+            repeats = self.shapes[shape]
+
+        threshold = settings.sql_n_plus_one_threshold
+        if settings.sql_n_plus_one_mode == "raise" and repeats > threshold:
+            raise NPlusOneError(
+                f"{self.label}: statement ran {repeats} times in one request "
+                f"(limit {threshold}): {shape[:200]}"
+            )
+
+    def repeated(self) -> list[tuple[str, int]]:
+        threshold = settings.sql_n_plus_one_threshold
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current: ContextVar[RequestQueries | None] = ContextVar("familyhub_request_queries", default=None)
+
+
+def current_queries() -> RequestQueries | None:
+    return _current.get()
+
+
+@contextmanager
+def untracked():
+    """
+    Don't charge statements to the current request: for admin tooling that
+    issues many similar queries on purpose and must not trip the N+1 guard.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install_query_hooks() -> None:
+    """Hook every Engine (sync, read and the async engine's sync_engine)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteTotals:
+    """Requests / queries / DB time per route, for /admin/diagnostics."""
+
+    def __init__(self, max_routes: int = 200):
+        self.max_routes = max_routes
+        self._routes: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.n_plus_one_warnings = 0
+
+    def add(self, route: str, queries: int, db_time: float) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                if len(self._routes) >= self.max_routes:
+                    return
+                entry = self._routes[route] = [0, 0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += queries
+            entry[2] += db_time
+            entry[3] = max(entry[3], queries)
+
+    def top(self, limit: int = 15) -> list[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "requests": n,
+                    "avg_queries": round(q / n, 1),
+                    "max_queries": max_q,
+                    "avg_db_ms": round(1000 * t / n, 2),
+                }
+                for route, (n, q, t, max_q) in self._routes.items()
+            ]
+        rows.sort(key=lambda r: r["avg_queries"], reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.sql_n_plus_one_mode,
+            "threshold": settings.sql_n_plus_one_threshold,
+            "routes_tracked": len(self._routes),
+            "n_plus_one_warnings": self.n_plus_one_warnings,
+        }
+
+
+route_totals = RouteTotals()
+
+
+class QueryStatsMiddleware:
+    """Plain ASGI middleware so the contextvar is set in the request's own context."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/static"):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueries(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+        scope.setdefault("state", {})["queries"] = stats
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            self._finish(scope, stats)
+
+    def _finish(self, scope, stats: RequestQueries) -> None:
+        route = scope.get("route")
+        route_totals.add(
+            f"{scope['method']} {getattr(route, 'path', scope['path'])}",
+            stats.count,
+            stats.db_time,
+        )
+
+        if stats.count >= settings.sql_log_request_queries:
+            print(f"[SQL] {stats.label}: {stats.count} queries, {stats.db_time * 1000:.1f} ms in DB")
+
+        if settings.sql_n_plus_one_mode == "warn":
+            for shape, n in stats.repeated():
+                route_totals.n_plus_one_warnings += 1
+                print(f"[SQL] Possible N+1 in {stats.label}: ran {n}x: {shape[:200]}")
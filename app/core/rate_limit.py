@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from .config import settings
+
+
+@dataclass
+class _Bucket:
+    attempts: deque = field(default_factory=deque)
+    rejected: int = 0
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window rate limiter.
+
+    Each key may make `max_attempts` attempts per `window_seconds`. Keys
+    are kept in an LRU bounded by `max_keys`, so a spray of distinct IPs /
+    emails can't grow memory without limit.
+    """
+
+    def __init__(self, max_attempts: int, window_seconds: float, max_keys: int = 10000):
+        self.max_attempts = max(1, int(max_attempts))
+        self.window_seconds = float(window_seconds)
+        self.max_keys = max(1, int(max_keys))
+
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def hit(self, key: str) -> tuple[bool, bool]:
+        """
+        Record an attempt for `key`.
+
+        Returns (allowed, first_rejection). `first_rejection` is True only
+        for the first rejected attempt since the key was last allowed, so
+        callers can log a lockout once rather than per attempt.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(key)
+            self._expire(bucket, now)
+
+            if len(bucket.attempts) >= self.max_attempts:
+                bucket.rejected += 1
+                self.rejected += 1
+                return False, bucket.rejected == 1
+
+            bucket.attempts.append(now)
+            bucket.rejected = 0
+            self.allowed += 1
+            return True, False
+
+    def retry_after(self, key: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if not bucket or not bucket.attempts:
+                return 0
+            return max(0, int(bucket.attempts[0] + self.window_seconds - now) + 1)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._buckets),
+                "max_keys": self.max_keys,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+                "locked_out": sum(1 for b in self._buckets.values() if b.rejected),
+            }
+
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _expire(self, bucket: _Bucket, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while bucket.attempts and bucket.attempts[0] <= cutoff:
+            bucket.attempts.popleft()
+
+
+# Shared by /login and /mfa. Attempts are counted per client IP and per
+# account (email for /login, pending user id for /mfa).
+auth_ip_limiter = SlidingWindowLimiter(
+    max_attempts=settings.auth_rate_limit_ip_attempts,
+    window_seconds=settings.auth_rate_limit_window_seconds,
+    max_keys=settings.auth_rate_limit_max_keys,
+)
+auth_account_limiter = SlidingWindowLimiter(
+    max_attempts=settings.auth_rate_limit_account_attempts,
+    window_seconds=settings.auth_rate_limit_window_seconds,
+    max_keys=settings.auth_rate_limit_max_keys,
+)
@@ -1,10 +1,55 @@
+import asyncio
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone  # you can remove timezone if you want
 
 import pyotp
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .config import settings
+
+
+def _build_pwd_context() -> CryptContext:
+    """
+    The configured scheme hashes new passwords; the others stay verifiable
+    and are marked deprecated, so needs_update() flags them for rehash.
+    Min/max rounds are pinned to the configured cost so raising *or*
+    lowering it also triggers a rehash on the next login.
+    """
+    scheme = settings.password_hash_scheme
+    schemes = [scheme] + [s for s in ("bcrypt", "argon2") if s != scheme]
+
+    options = {
+        "bcrypt__default_rounds": settings.password_bcrypt_rounds,
+        "bcrypt__min_rounds": settings.password_bcrypt_rounds,
+        "bcrypt__max_rounds": settings.password_bcrypt_rounds,
+    }
+    if scheme == "argon2":
+        # Requires argon2-cffi
+        options.update(
+            {
+                "argon2__default_rounds": settings.password_argon2_time_cost,
+                "argon2__min_rounds": settings.password_argon2_time_cost,
+                "argon2__max_rounds": settings.password_argon2_time_cost,
+                "argon2__memory_cost": settings.password_argon2_memory_cost,
+                "argon2__parallelism": settings.password_argon2_parallelism,
+            }
+        )
+
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+pwd_context = _build_pwd_context()
+
+# Hashing is CPU-bound (~250ms per bcrypt call at cost 12). The async
+# variants run it on a small dedicated pool, which caps how many cores
+# logins can take at once and keeps it off the event loop. The sync
+# variants hash inline: they already run on a request threadpool thread,
+# and handing off to the pool would only add a queue in front of it.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=max(1, settings.password_hash_workers),
+    thread_name_prefix="pwd-hash",
+)
 
 
 def hash_password(password: str) -> str:
@@ -15,6 +60,24 @@ def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and, if the stored hash uses outdated parameters,
+    return a fresh hash to store in its place (otherwise None).
+    """
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, pwd_context.hash, password)
+
+
+async def verify_and_update_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, pwd_context.verify_and_update, password, password_hash)
+
+
 def new_token(nbytes: int = 32) -> str:
     return secrets.token_urlsafe(nbytes)
 
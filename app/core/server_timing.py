@@ -0,0 +1,94 @@
+"""
+Server-Timing header for HTML responses.
+
+Phases are timed with `phase(name)` around auth (deps), template rendering
+(routes/_render.py) and activity logging; DB time comes from the
+per-request SQL counters in core/query_stats.py. Auth includes the
+queries it runs, so the phases can overlap.
+
+When disabled no middleware is installed and phase() returns a shared
+no-op context manager after one contextvar lookup.
+"""
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from .query_stats import current_queries
+
+
+_NOOP = nullcontext()
+
+
+class ServerTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        parts = [f"{name};dur={secs * 1000:.2f}" for name, secs in self.phases.items()]
+        queries = current_queries()
+        if queries is not None:
+            parts.append(f'db;dur={queries.db_time * 1000:.2f};desc="{queries.count} queries"')
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[ServerTiming | None] = ContextVar("familyhub_server_timing", default=None)
+
+
+class _Phase:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing: ServerTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timing.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def phase(name: str):
+    timing = _current.get()
+    if timing is None:
+        return _NOOP
+    return _Phase(timing, name)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds Server-Timing to text/html responses. Installed inside
+    QueryStatsMiddleware so the request's SQL counters are still current
+    when the response starts.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        token = _current.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = next((v for k, v in headers if k == b"content-type"), b"")
+                if content_type.startswith(b"text/html"):
+                    message["headers"] = list(headers) + [(b"server-timing", timing.header().encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .config import settings
+
+
+# Columns copied off the ORM rows. Kept as plain values so an entry is safe
+# to share between threads and sessions.
+USER_FIELDS = (
+    "id",
+    "household_id",
+    "email",
+    "display_name",
+    "password_hash",
+    "is_admin",
+    "totp_enabled",
+    "totp_secret",
+    "is_active",
+    "created_at",
+    "last_login_at",
+    "token_generation",
+)
+
+SESSION_FIELDS = (
+    "id",
+    "user_id",
+    "token",
+    "created_at",
+    "expires_at",
+    "last_seen_at",
+)
+
+
+@dataclass
+class CachedAuth:
+    user: dict
+    session: dict | None  # None for signed (stateless) tokens
+    expires_at: datetime
+    cached_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def user_id(self) -> int:
+        return self.user["id"]
+
+
+def snapshot(sess, user, expires_at: datetime | None = None) -> CachedAuth:
+    return CachedAuth(
+        user={name: getattr(user, name) for name in USER_FIELDS},
+        session={name: getattr(sess, name) for name in SESSION_FIELDS} if sess is not None else None,
+        expires_at=expires_at or sess.expires_at,
+    )
+
+
+class SessionCache:
+    """
+    Bounded LRU of token -> CachedAuth with a per-entry TTL.
+
+    Entries are dropped when they age out, when the underlying session
+    expires, or when something invalidates the token / user explicitly.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.enabled = enabled and self.ttl_seconds > 0
+
+        self._entries: OrderedDict[str, CachedAuth] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str, now: datetime) -> CachedAuth | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if (
+                time.monotonic() - entry.cached_at > self.ttl_seconds
+                or entry.expires_at < now
+            ):
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, entry: CachedAuth) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = entry
+            self._tokens_by_user.setdefault(entry.user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user_id]
+
+
+session_cache = SessionCache(
+    max_entries=settings.session_cache_max_entries,
+    ttl_seconds=settings.session_cache_ttl_seconds,
+    enabled=settings.session_cache_enabled,
+)
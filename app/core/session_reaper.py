@@ -0,0 +1,62 @@
+import time
+
+from .config import settings
+from .db import SessionLocal
+from .periodic import PeriodicWorker
+
+
+class SessionReaper(PeriodicWorker):
+    """
+    Periodically deletes expired rows from `sessions` and `revoked_tokens`
+    in bounded batches.
+    """
+
+    thread_name = "session-reaper"
+    # First pass straight away so a restart clears any backlog.
+    tick_on_start = True
+
+    def __init__(self, interval_seconds: float, batch_size: int):
+        super().__init__(max(1.0, float(interval_seconds)))
+        self.batch_size = max(1, int(batch_size))
+
+        self.runs = 0
+        self.rows_removed = 0
+        self.last_run_removed = 0
+        self.last_run_seconds = 0.0
+
+    def run_once(self) -> int:
+        from app import crud
+
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                removed = crud.prune_sessions(db, batch_size=self.batch_size)
+                removed += crud.prune_revoked_tokens(db, batch_size=self.batch_size)
+        except Exception as e:
+            print(f"[SESSION_REAPER] Failed: {e}")
+            return 0
+        elapsed = time.perf_counter() - started
+
+        self.runs += 1
+        self.rows_removed += removed
+        self.last_run_removed = removed
+        self.last_run_seconds = elapsed
+        print(f"[SESSION_REAPER] Removed {removed} expired session(s) / revoked token(s) in {elapsed * 1000:.1f} ms")
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rows_removed": self.rows_removed,
+            "last_run_removed": self.last_run_removed,
+            "last_run_ms": round(self.last_run_seconds * 1000, 1),
+        }
+
+    def tick(self) -> None:
+        self.run_once()
+
+
+session_reaper = SessionReaper(
+    interval_seconds=settings.session_reaper_interval_seconds,
+    batch_size=settings.session_reaper_batch_size,
+)
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from .config import settings
+from .db import SessionLocal
+from .periodic import PeriodicWorker
+
+
+class SessionTouchBuffer(PeriodicWorker):
+    """
+    Write-behind buffer for sessions.last_seen_at.
+
+    Requests record a touch in memory; a background thread writes all
+    pending touches in one batched UPDATE every `interval_seconds`, or
+    sooner once `max_pending` sessions are waiting.
+
+    It also remembers when each session was last touched (bounded LRU), so
+    the `window` check doesn't depend on the caller's last_seen_at, which
+    is frozen in session-cache snapshots. "sync" mode uses due() for the
+    same reason.
+    """
+
+    thread_name = "session-touch-flusher"
+
+    def __init__(self, interval_seconds: float, max_pending: int, window_seconds: float, max_tracked: int = 10000):
+        super().__init__(max(1.0, float(interval_seconds)))
+        self.max_pending = max(1, int(max_pending))
+        self.window = timedelta(seconds=max(0.0, float(window_seconds)))
+
+        self._pending: dict[int, datetime] = {}
+        self._last_touch: OrderedDict[int, datetime] = OrderedDict()
+        self.max_tracked = max(1, int(max_tracked))
+        self._lock = threading.Lock()
+
+        self.touches = 0
+        self.skipped = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def due(self, session_id: int, last_seen_at: datetime | None, now: datetime) -> bool:
+        """
+        True (and `now` is recorded as the last touch) when the session
+        hasn't been touched within the window; False means skip the write.
+        """
+        with self._lock:
+            return self._due(session_id, last_seen_at, now)
+
+    def _due(self, session_id: int, last_seen_at: datetime | None, now: datetime) -> bool:
+        seen = self._last_touch.get(session_id)
+        if seen is None or (last_seen_at and last_seen_at > seen):
+            seen = last_seen_at
+        if seen and now - seen < self.window:
+            self.skipped += 1
+            return False
+        self._last_touch[session_id] = now
+        self._last_touch.move_to_end(session_id)
+        if len(self._last_touch) > self.max_tracked:
+            self._last_touch.popitem(last=False)
+        return True
+
+    def touch(self, session_id: int, last_seen_at: datetime | None, now: datetime) -> None:
+        with self._lock:
+            if not self._due(session_id, last_seen_at, now):
+                return
+            self._pending[session_id] = now
+            self.touches += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.wake()
+
+    def flush(self) -> int:
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+        rows = [{"id": sid, "ts": ts} for sid, ts in batch.items()]
+        try:
+            with SessionLocal() as db:
+                db.execute(text("UPDATE sessions SET last_seen_at = :ts WHERE id = :id"), rows)
+                db.commit()
+        except Exception as e:
+            # Put the batch back (newer touches win) so it is retried next tick.
+            with self._lock:
+                for sid, ts in batch.items():
+                    self._pending.setdefault(sid, ts)
+            print(f"[SESSION_TOUCH] Flush failed: {e}")
+            return 0
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(rows)
+        return len(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "tracked": len(self._last_touch),
+                "touches": self.touches,
+                "skipped": self.skipped,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+            }
+
+    def tick(self) -> None:
+        self.flush()
+
+    def on_stop(self) -> None:
+        self.flush()
+
+
+session_touches = SessionTouchBuffer(
+    interval_seconds=settings.session_touch_flush_interval_seconds,
+    max_pending=settings.session_touch_flush_max,
+    window_seconds=settings.session_touch_window_seconds,
+)
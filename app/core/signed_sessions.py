@@ -0,0 +1,80 @@
+import secrets
+import threading
+import time
+
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from .config import settings
+
+
+class SignedSessions:
+    """
+    Stateless session tokens signed with settings.secret_key.
+
+    A token carries the user id, household id, admin flag, the user's token
+    generation and an expiry, so signature and expiry are checked without
+    a DB lookup. Revocation lives in the database, so it survives restarts
+    and holds on every worker:
+      - logout records the token id (jti) in revoked_tokens until it expires
+      - disabling a user / changing password, role or TOTP bumps
+        users.token_generation, which invalidates every older token
+    Both are checked against the DB whenever the session cache misses
+    (deps._user_from_signed_token), so other workers see them within
+    settings.session_cache_ttl_seconds. The worker handling the logout
+    also remembers the jti in memory and rejects it straight away.
+    """
+
+    def __init__(self, secret_key: str, ttl_minutes: int):
+        self.ttl_seconds = int(ttl_minutes) * 60
+        self._serializer = URLSafeSerializer(secret_key, salt="familyhub.session")
+
+        self._revoked: dict[str, float] = {}  # jti -> exp, for this worker's logouts
+        self._lock = threading.Lock()
+
+    def issue(self, user) -> str:
+        claims = {
+            "uid": user.id,
+            "hid": user.household_id,
+            "adm": bool(user.is_admin),
+            "gen": user.token_generation or 0,
+            "exp": int(time.time()) + self.ttl_seconds,
+            "jti": secrets.token_urlsafe(8),
+        }
+        return self._serializer.dumps(claims)
+
+    def load(self, token: str) -> dict | None:
+        try:
+            claims = self._serializer.loads(token)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+            return None
+        with self._lock:
+            if claims.get("jti") in self._revoked:
+                return None
+        return claims
+
+    def revoke(self, token: str) -> dict | None:
+        """
+        Forget the token on this worker. Returns its claims so the caller
+        can persist the revocation (crud.revoke_signed_token).
+        """
+        try:
+            claims = self._serializer.loads(token)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or "jti" not in claims:
+            return None
+        now = time.time()
+        with self._lock:
+            # Expired tokens are rejected anyway, so keep the set small.
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._revoked[claims["jti"]] = claims.get("exp", now)
+        return claims
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"revoked_here": len(self._revoked)}
+
+
+signed_sessions = SignedSessions(settings.secret_key, settings.session_ttl_minutes)
@@ -20,13 +20,28 @@ from .users import (
     set_user_password,
     set_user_admin,
     set_user_active,
+    enable_totp,
+    disable_totp,
 )
 
 # sessions
 from .sessions import (
     create_session,
     get_session_by_token,
+    touch_session,
     delete_session,
+    prune_sessions,
+    revoke_signed_token,
+    is_token_revoked,
+    prune_revoked_tokens,
+)
+
+# activity log
+from .activity import (
+    list_activity,
+    iter_activity,
+    rollup_daily,
+    rollup_top_actors,
 )
 
 # calendar
@@ -40,6 +55,7 @@ from .chores import (
     list_chores,
     create_chore,
     last_completed_on,
+    last_completed_by_chore,
 )
 
 # mealplan
@@ -64,10 +80,18 @@ from .shopping import (
     archive_list,
     list_items,
     add_item,
+    parse_bulk_items,
+    add_items_bulk,
     get_item,
-    toggle_item,
-    delete_item,
+    toggled_event,
+    deleted_event,
+    toggle_owned_item,
+    delete_owned_item,
     count_open_items,
+    count_open_items_by_list,
+    list_lists_with_counts,
+    repair_list_counts,
+    shopping_list_view,
 )
 
 __all__ = [
@@ -84,11 +108,24 @@ __all__ = [
     "set_user_password",
     "set_user_admin",
     "set_user_active",
+    "enable_totp",
+    "disable_totp",
 
     # sessions
     "create_session",
     "get_session_by_token",
+    "touch_session",
     "delete_session",
+    "prune_sessions",
+    "revoke_signed_token",
+    "is_token_revoked",
+    "prune_revoked_tokens",
+
+    # activity log
+    "list_activity",
+    "iter_activity",
+    "rollup_daily",
+    "rollup_top_actors",
 
     # calendar
     "list_upcoming_events",
@@ -98,6 +135,7 @@ __all__ = [
     "list_chores",
     "create_chore",
     "last_completed_on",
+    "last_completed_by_chore",
 
     # mealplan
     "upsert_meal",
@@ -116,8 +154,16 @@ __all__ = [
     "archive_list",
     "list_items",
     "add_item",
+    "parse_bulk_items",
+    "add_items_bulk",
     "get_item",
-    "toggle_item",
-    "delete_item",
+    "toggled_event",
+    "deleted_event",
+    "toggle_owned_item",
+    "delete_owned_item",
     "count_open_items",
+    "count_open_items_by_list",
+    "list_lists_with_counts",
+    "repair_list_counts",
+    "shopping_list_view",
 ]
@@ -0,0 +1,183 @@
+from datetime import date, timedelta
+from sqlalchemy import text
+
+
+def _activity_filters(
+    action: str | None = None,
+    actor_user_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    """
+    Build WHERE clauses + params for the activity log. Each filter lines up
+    with an index from migrations/005_activity_log_indexes.sql.
+    """
+    where = []
+    params = {}
+
+    if action:
+        where.append("al.action = :action")
+        params["action"] = action
+    if actor_user_id:
+        where.append("al.actor_user_id = :actor")
+        params["actor"] = actor_user_id
+    if date_from:
+        where.append("al.timestamp >= :ts_from")
+        params["ts_from"] = date_from.isoformat()
+    if date_to:
+        # inclusive of the whole end day
+        where.append("al.timestamp < :ts_to")
+        params["ts_to"] = (date_to + timedelta(days=1)).isoformat()
+
+    return where, params
+
+
+def encode_activity_cursor(row) -> str:
+    return f"{row.timestamp}|{row.id}"
+
+
+def decode_activity_cursor(cursor: str | None) -> tuple[str, int] | None:
+    if not cursor or "|" not in cursor:
+        return None
+    ts, _, row_id = cursor.rpartition("|")
+    try:
+        return ts, int(row_id)
+    except ValueError:
+        return None
+
+
+def list_activity(
+    db,
+    *,
+    action: str | None = None,
+    actor_user_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    before: str | None = None,
+    limit: int = 100,
+):
+    """
+    One page of activity, newest first, using keyset pagination on
+    (timestamp, id). `before` is the cursor of the last row of the previous
+    page. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    where, params = _activity_filters(action, actor_user_id, date_from, date_to)
+
+    cursor = decode_activity_cursor(before)
+    if cursor:
+        where.append("(al.timestamp < :cur_ts OR (al.timestamp = :cur_ts AND al.id < :cur_id))")
+        params["cur_ts"], params["cur_id"] = cursor
+
+    params["limit"] = limit + 1
+    sql = f"""
+        SELECT
+            al.id,
+            al.timestamp,
+            al.actor_email,
+            al.action,
+            u.display_name AS target_name,
+            u.email AS target_email,
+            al.details
+        FROM activity_log al
+        LEFT JOIN users u
+            ON al.entity_type = 'user'
+           AND al.entity_id = u.id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY al.timestamp DESC, al.id DESC
+        LIMIT :limit
+    """
+    rows = db.execute(text(sql), params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_activity_cursor(rows[-1])
+    return rows, next_cursor
+
+
+EXPORT_COLUMNS = (
+    "id",
+    "timestamp",
+    "actor_user_id",
+    "actor_email",
+    "action",
+    "entity_type",
+    "entity_id",
+    "details",
+)
+
+
+def iter_activity(
+    db,
+    *,
+    action: str | None = None,
+    actor_user_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    chunk_size: int = 1000,
+):
+    """
+    Yield lists of activity rows (oldest first) in chunks of `chunk_size`
+    from a server-side cursor, so memory stays flat however many rows match.
+    """
+    where, params = _activity_filters(action, actor_user_id, date_from, date_to)
+    sql = f"""
+        SELECT {", ".join("al." + c for c in EXPORT_COLUMNS)}
+        FROM activity_log al
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY al.timestamp, al.id
+    """
+    result = db.execute(
+        text(sql).execution_options(stream_results=True, yield_per=chunk_size),
+        params,
+    )
+    try:
+        for chunk in result.partitions(chunk_size):
+            yield chunk
+    finally:
+        result.close()
+
+
+# ---- Rollups (activity_rollups, see migrations/006) ----
+
+def rollup_daily(db, *, actions: list[str] | None = None, action_prefix: str | None = None, since: date):
+    """Daily totals from activity_rollups for the given actions (or prefix)."""
+    where = ["day >= :since"]
+    params = {"since": since.isoformat()}
+    if actions:
+        names = []
+        for i, a in enumerate(actions):
+            params[f"a{i}"] = a
+            names.append(f":a{i}")
+        where.append(f"action IN ({', '.join(names)})")
+    if action_prefix:
+        # range form so the (action, day) index can be used
+        where.append("action >= :p_lo AND action < :p_hi")
+        params["p_lo"] = action_prefix
+        params["p_hi"] = action_prefix[:-1] + chr(ord(action_prefix[-1]) + 1)
+
+    return db.execute(
+        text(f"""
+            SELECT day, SUM(count) AS total
+            FROM activity_rollups
+            WHERE {" AND ".join(where)}
+            GROUP BY day
+            ORDER BY day
+        """),
+        params,
+    ).fetchall()
+
+
+def rollup_top_actors(db, *, since: date, limit: int = 10):
+    return db.execute(
+        text("""
+            SELECT r.actor_user_id, u.display_name, u.email, SUM(r.count) AS total
+            FROM activity_rollups r
+            JOIN users u ON u.id = r.actor_user_id
+            WHERE r.day >= :since
+            GROUP BY r.actor_user_id, u.display_name, u.email
+            ORDER BY total DESC
+            LIMIT :limit
+        """),
+        {"since": since.isoformat(), "limit": limit},
+    ).fetchall()
@@ -0,0 +1,171 @@
+"""
+AsyncSession versions of the queries used by routes/async_routes.py.
+
+Same behaviour as their sync counterparts in this package, with one rule:
+anything a template touches is loaded up front (selectinload / plain
+columns), because an AsyncSession can't lazy-load on attribute access.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.core.config import settings
+from app.core.list_events import list_events
+from app.core.security import new_token, expires_in, now_utc, verify_and_update_password_async
+from app.core.session_cache import session_cache
+from app.core.session_touch import session_touches
+from app.crud.shopping import (
+    ShoppingListView,
+    category_options_query,
+    group_list_items,
+    list_counts_stmt,
+    list_header_query,
+    list_view_items_query,
+    toggle_item_stmt,
+    toggled_event,
+)
+
+
+# ---- Users / sessions ----
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+
+async def is_token_revoked(db: AsyncSession, jti: str) -> bool:
+    res = await db.execute(select(models.RevokedToken.jti).where(models.RevokedToken.jti == jti))
+    return res.first() is not None
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(models.User).where(models.User.email == email))).scalars().first()
+    if not user or not user.is_active:
+        return None
+    ok, new_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not ok:
+        return None
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        session_cache.invalidate_user(user.id)
+    return user
+
+
+async def create_session(db: AsyncSession, user: models.User, ttl_minutes: int):
+    sess = models.Session(
+        user_id=user.id,
+        token=new_token(),
+        expires_at=expires_in(ttl_minutes),
+    )
+    db.add(sess)
+    await db.commit()
+    return sess
+
+
+async def get_session_by_token(db: AsyncSession, token: str):
+    if not token:
+        return None
+
+    sess = (await db.execute(select(models.Session).where(models.Session.token == token))).scalars().first()
+    if not sess:
+        return None
+
+    if sess.expires_at < now_utc():
+        await db.delete(sess)
+        await db.commit()
+        return None
+
+    return sess
+
+
+async def touch_session(db: AsyncSession, sess: models.Session):
+    mode = settings.session_touch_mode
+    now = now_utc()
+
+    if mode == "write_behind":
+        session_touches.touch(sess.id, sess.last_seen_at, now)
+    elif mode == "sync":
+        if not session_touches.due(sess.id, sess.last_seen_at, now):
+            return
+        await db.execute(
+            update(models.Session).where(models.Session.id == sess.id).values(last_seen_at=now)
+        )
+        await db.commit()
+
+
+# ---- Dashboard ----
+
+async def list_upcoming_events(db: AsyncSession, household_id: int, from_dt: datetime, limit: int = 10):
+    res = await db.execute(
+        select(models.CalendarEvent)
+        .where(
+            models.CalendarEvent.household_id == household_id,
+            models.CalendarEvent.start_at >= from_dt,
+        )
+        .order_by(models.CalendarEvent.start_at.asc())
+        .limit(limit)
+    )
+    return res.scalars().all()
+
+
+async def list_chores(db: AsyncSession, household_id: int):
+    res = await db.execute(
+        select(models.Chore)
+        .where(
+            models.Chore.household_id == household_id,
+            models.Chore.is_active == True,  # noqa: E712
+        )
+        .order_by(models.Chore.created_at.asc())
+    )
+    return res.scalars().all()
+
+
+async def last_completed_by_chore(db: AsyncSession, chore_ids: list[int]) -> dict[int, date]:
+    """chore_id -> latest completed_on, in one grouped query."""
+    if not chore_ids:
+        return {}
+    res = await db.execute(
+        select(models.ChoreCompletion.chore_id, func.max(models.ChoreCompletion.completed_on))
+        .where(models.ChoreCompletion.chore_id.in_(chore_ids))
+        .group_by(models.ChoreCompletion.chore_id)
+    )
+    return {chore_id: done for chore_id, done in res.all()}
+
+
+async def list_meals_in_range(db: AsyncSession, household_id: int, start: date, end: date):
+    res = await db.execute(
+        select(models.MealPlanEntry)
+        .where(
+            models.MealPlanEntry.household_id == household_id,
+            models.MealPlanEntry.meal_date >= start,
+            models.MealPlanEntry.meal_date <= end,
+        )
+        .order_by(models.MealPlanEntry.meal_date.asc())
+    )
+    return res.scalars().all()
+
+
+# ---- Shopping ----
+
+async def shopping_list_view(db: AsyncSession, list_id: int, household_id: int) -> ShoppingListView | None:
+    lst = (await db.execute(list_header_query(list_id, household_id))).first()
+    if lst is None:
+        return None
+    rows = (await db.execute(list_view_items_query(list_id, household_id))).all()
+    categories = (await db.execute(category_options_query(household_id))).all()
+    return ShoppingListView(lst=lst, groups=group_list_items(rows), categories=categories, item_count=len(rows))
+
+
+async def toggle_owned_item(db: AsyncSession, item_id: int, household_id: int):
+    row = (await db.execute(toggle_item_stmt(item_id, household_id))).first()
+    if row is None:
+        await db.rollback()
+        return None
+    await db.execute(list_counts_stmt(row.list_id, -1 if row.is_checked else 1, 0))
+    await db.commit()
+    list_events.publish(row.list_id, toggled_event(row))
+    return row
@@ -1,4 +1,5 @@
 from datetime import date
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app import models
@@ -44,3 +45,16 @@ def last_completed_on(db: Session, chore_id: int):
         .first()
     )
     return row[0] if row else None
+
+
+def last_completed_by_chore(db: Session, chore_ids: list[int]) -> dict[int, date]:
+    """chore_id -> latest completed_on for many chores in one grouped query."""
+    if not chore_ids:
+        return {}
+    rows = (
+        db.query(models.ChoreCompletion.chore_id, func.max(models.ChoreCompletion.completed_on))
+        .filter(models.ChoreCompletion.chore_id.in_(chore_ids))
+        .group_by(models.ChoreCompletion.chore_id)
+        .all()
+    )
+    return {chore_id: done for chore_id, done in rows}
@@ -1,8 +1,12 @@
 from datetime import datetime
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 from app import models
+from app.core.config import settings
 from app.core.security import new_token, expires_in, now_utc
+from app.core.session_cache import session_cache
+from app.core.session_touch import session_touches
 
 
 def create_session(db: Session, user: models.User, ttl_minutes: int):
@@ -40,7 +44,26 @@ def get_session_by_token(db: Session, token: str):
     return sess
 
 
+def touch_session(db: Session, sess: models.Session):
+    """
+    Record that the session was just used. Depending on settings this is
+    buffered (write-behind), written immediately, or skipped.
+    """
+    mode = settings.session_touch_mode
+    now = now_utc()
+
+    if mode == "write_behind":
+        session_touches.touch(sess.id, sess.last_seen_at, now)
+    elif mode == "sync":
+        if not session_touches.due(sess.id, sess.last_seen_at, now):
+            return
+        sess.last_seen_at = now
+        db.add(sess)
+        db.commit()
+
+
 def delete_session(db: Session, token: str):
+    session_cache.invalidate_token(token)
     sess = (
         db.query(models.Session)
         .filter(models.Session.token == token)
@@ -49,3 +72,59 @@ def delete_session(db: Session, token: str):
     if sess:
         db.delete(sess)
         db.commit()
+
+
+def revoke_signed_token(db: Session, claims: dict) -> None:
+    """Persist a signed token's logout so every worker, and a restarted one, rejects it."""
+    db.merge(
+        models.RevokedToken(
+            jti=claims["jti"],
+            user_id=claims.get("uid") or 0,
+            expires_at=datetime.utcfromtimestamp(claims.get("exp", 0)),
+        )
+    )
+    db.commit()
+
+
+def is_token_revoked(db: Session, jti: str) -> bool:
+    return db.execute(
+        select(models.RevokedToken.jti).where(models.RevokedToken.jti == jti)
+    ).first() is not None
+
+
+def prune_sessions(db: Session, batch_size: int = 500, max_batches: int | None = None) -> int:
+    """
+    Delete expired sessions in batches of `batch_size`, committing between
+    batches so the write lock is never held for long. Walks the expires_at
+    index oldest-first. Returns the number of rows removed.
+    """
+    return _prune_expired(db, models.Session, models.Session.id, batch_size, max_batches)
+
+
+def prune_revoked_tokens(db: Session, batch_size: int = 500, max_batches: int | None = None) -> int:
+    """prune_sessions() for revoked_tokens rows whose token has expired anyway."""
+    return _prune_expired(db, models.RevokedToken, models.RevokedToken.jti, batch_size, max_batches)
+
+
+def _prune_expired(db: Session, model, key, batch_size: int, max_batches: int | None) -> int:
+    now = now_utc()
+    removed = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        expired_keys = (
+            select(key)
+            .where(model.expires_at < now)
+            .order_by(model.expires_at)
+            .limit(batch_size)
+        )
+        res = db.execute(delete(model).where(key.in_(expired_keys)))
+        db.commit()
+
+        count = res.rowcount or 0
+        removed += count
+        batches += 1
+        if count < batch_size:
+            break
+
+    return removed
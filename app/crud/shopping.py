@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from itertools import groupby
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, delete, func, not_, select, text, update
 
 from app import models
+from app.core.list_events import list_events
 
 
 # ---- Shops ----
@@ -31,6 +35,7 @@ def create_shop(db: Session, household_id: int, name: str) -> models.ShoppingSho
 def list_lists(db: Session, household_id: int, include_archived: bool = False):
     q = (
         db.query(models.ShoppingList)
+        .options(joinedload(models.ShoppingList.shop))
         .filter(models.ShoppingList.household_id == household_id)
     )
     if not include_archived:
@@ -61,6 +66,29 @@ def create_list(
     return lst
 
 
+def list_lists_with_counts(db: Session, household_id: int, include_archived: bool = False):
+    """
+    Rows for the shopping home page: list columns, shop name and the
+    denormalised item counters, in one joined query.
+    """
+    q = (
+        select(
+            models.ShoppingList.id,
+            models.ShoppingList.name,
+            models.ShoppingList.shop_id,
+            func.coalesce(models.ShoppingShop.name, "").label("shop_name"),
+            models.ShoppingList.created_at,
+            models.ShoppingList.open_count,
+            models.ShoppingList.total_count,
+        )
+        .outerjoin(models.ShoppingShop, models.ShoppingShop.id == models.ShoppingList.shop_id)
+        .where(models.ShoppingList.household_id == household_id)
+    )
+    if not include_archived:
+        q = q.where(models.ShoppingList.is_archived == False)  # noqa: E712
+    return db.execute(q.order_by(models.ShoppingList.created_at.desc())).all()
+
+
 def archive_list(db: Session, lst: models.ShoppingList, archived: bool = True) -> None:
     lst.is_archived = bool(archived)
     db.add(lst)
@@ -69,9 +97,35 @@ def archive_list(db: Session, lst: models.ShoppingList, archived: bool = True) -
 
 # ---- Items ----
 
+def list_counts_stmt(list_id: int, open_delta: int, total_delta: int):
+    return (
+        update(models.ShoppingList)
+        .where(models.ShoppingList.id == list_id)
+        .values(
+            open_count=models.ShoppingList.open_count + open_delta,
+            total_count=models.ShoppingList.total_count + total_delta,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _bump_list_counts(db: Session, list_id: int, open_delta: int, total_delta: int) -> None:
+    """Adjust the list's counters in the caller's transaction."""
+    db.execute(list_counts_stmt(list_id, open_delta, total_delta))
+
+
+def toggled_event(row) -> dict:
+    return {"type": "toggled", "id": row.id, "is_checked": bool(row.is_checked)}
+
+
+def deleted_event(row) -> dict:
+    return {"type": "deleted", "id": row.id}
+
+
 def list_items(db: Session, list_id: int):
     return (
         db.query(models.ShoppingItem)
+        .options(selectinload(models.ShoppingItem.category))
         .filter(models.ShoppingItem.list_id == list_id)
         .order_by(models.ShoppingItem.is_checked.asc(), models.ShoppingItem.created_at.desc())
         .all()
@@ -95,20 +149,168 @@ def add_item(
         created_at=datetime.utcnow(),
     )
     db.add(item)
+    _bump_list_counts(db, list_id, 1, 1)
     db.commit()
     db.refresh(item)
+    list_events.publish(list_id, {
+        "type": "added",
+        "item": {
+            "id": item.id,
+            "name": item.name,
+            "quantity": item.quantity,
+            "category_id": item.category_id,
+            "is_checked": False,
+        },
+    })
     return item
 
 
-def toggle_item(db: Session, item: models.ShoppingItem) -> None:
-    item.is_checked = not bool(item.is_checked)
-    db.add(item)
+_BULLET_RE = re.compile(r"^(?:(?:[-*\u2022]|\[[\sxX]?\]|\d+[.)])\s+)+")
+_UNIT = (
+    r"(?:l|ltrs?|litres?|liters?|ml|kg|g|grams?|lbs?|oz|pints?|packs?|packets?|bags?|bottles?"
+    r"|cans?|tins?|jars?|box(?:es)?|cartons?|bunch(?:es)?|loaf|loaves|dozen)\.?\s+(?:of\s+)?"
+)
+_LEADING_QTY_RE = re.compile(
+    rf"^(\d{{1,3}})(?:\s*(?:x|\u00d7|\*)?\s+(?:{_UNIT})?|\s*{_UNIT})(.+)$",
+    re.IGNORECASE,
+)
+_TRAILING_QTY_RE = re.compile(r"^(.+?)\s+(?:x|\u00d7|\*)\s*(\d{1,3})$", re.IGNORECASE)
+_CATEGORY_HINT_RE = re.compile(r"^(.+?)\s+[@#](\S.*)$")
+
+
+def parse_bulk_items(
+    pasted: str,
+    categories: dict[str, int],
+    default_category_id: int | None = None,
+    max_items: int = 200,
+) -> list[dict]:
+    """
+    One item per non-empty line of pasted text.
+
+      "2x milk", "2 milk", "milk x2"   -> quantity 2
+      "2 litre milk", "2 packs of ham" -> quantity 2, the unit is dropped
+      "bread @bakery"                  -> category hint (name, case-insensitive)
+      "Dairy:"                         -> category for the lines below it
+
+    `categories` maps lower-cased category names to ids. Unknown hints fall
+    back to the current section / default category. Bullets, checkboxes
+    ("- [ ] eggs") and list numbering are stripped; at most `max_items`
+    items are returned.
+    """
+    items = []
+    section_id = default_category_id
+    for raw in (pasted or "").splitlines():
+        line = _BULLET_RE.sub("", raw.strip()).strip()
+        if not line:
+            continue
+
+        if line.endswith(":") and line[:-1].strip().lower() in categories:
+            section_id = categories[line[:-1].strip().lower()]
+            continue
+
+        category_id = section_id
+        m = _CATEGORY_HINT_RE.match(line)
+        if m and m.group(2).strip().lower() in categories:
+            line, category_id = m.group(1), categories[m.group(2).strip().lower()]
+
+        quantity = 1
+        m = _LEADING_QTY_RE.match(line) or _TRAILING_QTY_RE.match(line)
+        if m:
+            qty, name = (m.group(1), m.group(2)) if m.re is _LEADING_QTY_RE else (m.group(2), m.group(1))
+            quantity, line = max(1, int(qty)), name
+
+        name = line.strip()[:200]
+        if not name:
+            continue
+        items.append({"name": name, "quantity": quantity, "category_id": category_id})
+        if len(items) >= max_items:
+            break
+    return items
+
+
+def add_items_bulk(db: Session, list_id: int, items: list[dict]) -> int:
+    """
+    Insert parsed items (see parse_bulk_items) with one executemany and
+    bump the list counters, all in one transaction. Returns the count.
+    """
+    if not items:
+        return 0
+    now = datetime.utcnow()
+    db.execute(
+        models.ShoppingItem.__table__.insert(),
+        [
+            {
+                "list_id": list_id,
+                "name": it["name"],
+                "quantity": it["quantity"],
+                "category_id": it["category_id"],
+                "is_checked": False,
+                "created_at": now,
+            }
+            for it in items
+        ],
+    )
+    _bump_list_counts(db, list_id, len(items), len(items))
     db.commit()
+    list_events.publish(list_id, {"type": "bulk_added", "count": len(items)})
+    return len(items)
 
 
-def delete_item(db: Session, item: models.ShoppingItem) -> None:
-    db.delete(item)
+def _in_household(household_id: int):
+    return models.ShoppingItem.list_id.in_(
+        select(models.ShoppingList.id).where(models.ShoppingList.household_id == household_id)
+    )
+
+
+def toggle_item_stmt(item_id: int, household_id: int):
+    """Flip is_checked on an item the household owns; RETURNING id, list_id, name, is_checked."""
+    item = models.ShoppingItem
+    return (
+        update(item)
+        .where(item.id == item_id, _in_household(household_id))
+        .values(is_checked=not_(item.is_checked))
+        .returning(item.id, item.list_id, item.name, item.is_checked)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_item_stmt(item_id: int, household_id: int):
+    """Delete an item the household owns; RETURNING id, list_id, name, is_checked."""
+    item = models.ShoppingItem
+    return (
+        delete(item)
+        .where(item.id == item_id, _in_household(household_id))
+        .returning(item.id, item.list_id, item.name, item.is_checked)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def toggle_owned_item(db: Session, item_id: int, household_id: int):
+    """
+    Ownership check and toggle in one UPDATE ... RETURNING, plus the
+    counter bump, in one commit. Returns the updated row, or None when the
+    item doesn't exist or belongs to another household.
+    """
+    row = db.execute(toggle_item_stmt(item_id, household_id)).first()
+    if row is None:
+        db.rollback()
+        return None
+    _bump_list_counts(db, row.list_id, -1 if row.is_checked else 1, 0)
     db.commit()
+    list_events.publish(row.list_id, toggled_event(row))
+    return row
+
+
+def delete_owned_item(db: Session, item_id: int, household_id: int):
+    """toggle_owned_item() for deletes: one DELETE ... RETURNING the removed row."""
+    row = db.execute(delete_item_stmt(item_id, household_id)).first()
+    if row is None:
+        db.rollback()
+        return None
+    _bump_list_counts(db, row.list_id, 0 if row.is_checked else -1, -1)
+    db.commit()
+    list_events.publish(row.list_id, deleted_event(row))
+    return row
 
 
 def get_item(db: Session, item_id: int) -> models.ShoppingItem | None:
@@ -122,3 +324,132 @@ def count_open_items(db: Session, list_id: int) -> int:
         .scalar()
         or 0
     )
+
+
+def count_open_items_by_list(db: Session, list_ids: list[int]) -> dict[int, int]:
+    """list_id -> number of unchecked items, for many lists in one query."""
+    if not list_ids:
+        return {}
+    rows = (
+        db.query(models.ShoppingItem.list_id, func.count(models.ShoppingItem.id))
+        .filter(models.ShoppingItem.list_id.in_(list_ids), models.ShoppingItem.is_checked == False)  # noqa: E712
+        .group_by(models.ShoppingItem.list_id)
+        .all()
+    )
+    return dict(rows)
+
+
+# ---- List page read model ----
+
+@dataclass
+class ShoppingListView:
+    lst: object  # row: id, name, household_id, shop_name, open_count, total_count
+    groups: list  # (label, color, icon, [item rows]) in display order
+    categories: list  # rows: id, name (for the add-item form)
+    item_count: int
+
+
+def list_header_query(list_id: int, household_id: int):
+    return (
+        select(
+            models.ShoppingList.id,
+            models.ShoppingList.name,
+            models.ShoppingList.household_id,
+            func.coalesce(models.ShoppingShop.name, "").label("shop_name"),
+            models.ShoppingList.open_count,
+            models.ShoppingList.total_count,
+        )
+        .outerjoin(models.ShoppingShop, models.ShoppingShop.id == models.ShoppingList.shop_id)
+        .where(models.ShoppingList.id == list_id, models.ShoppingList.household_id == household_id)
+    )
+
+
+def list_view_items_query(list_id: int, household_id: int):
+    """
+    Items with their category, ordered so each category is one contiguous
+    run. category_id is the category that resolved (one of the household's,
+    still existing), else None, so all unresolved items form one group.
+    """
+    cat = models.ShoppingCategory
+    item = models.ShoppingItem
+    return (
+        select(
+            item.id,
+            item.name,
+            item.quantity,
+            item.is_checked,
+            cat.id.label("category_id"),
+            cat.name.label("category_name"),
+            cat.color.label("category_color"),
+            cat.icon.label("category_icon"),
+        )
+        .outerjoin(cat, and_(cat.id == item.category_id, cat.household_id == household_id))
+        .where(item.list_id == list_id)
+        .order_by(
+            cat.name.is_(None),
+            cat.name,
+            cat.id,
+            item.is_checked.asc(),
+            item.created_at.desc(),
+        )
+    )
+
+
+def category_options_query(household_id: int):
+    return (
+        select(models.ShoppingCategory.id, models.ShoppingCategory.name)
+        .where(models.ShoppingCategory.household_id == household_id)
+        .order_by(models.ShoppingCategory.name)
+    )
+
+
+def group_list_items(rows) -> list:
+    groups = []
+    for _, run in groupby(rows, key=lambda r: r.category_id):
+        run = list(run)
+        first = run[0]
+        groups.append((first.category_name or "Uncategorised", first.category_color, first.category_icon, run))
+    return groups
+
+
+def shopping_list_view(db: Session, list_id: int, household_id: int) -> ShoppingListView | None:
+    """
+    Everything the list page renders, as plain rows, in three queries
+    however many items the list has. None when the list doesn't exist or
+    belongs to another household.
+    """
+    lst = db.execute(list_header_query(list_id, household_id)).first()
+    if lst is None:
+        return None
+    rows = db.execute(list_view_items_query(list_id, household_id)).all()
+    categories = db.execute(category_options_query(household_id)).all()
+    return ShoppingListView(lst=lst, groups=group_list_items(rows), categories=categories, item_count=len(rows))
+
+
+_REPAIR_LIST_COUNTS = (
+    text("UPDATE shopping_lists SET open_count = 0, total_count = 0"),
+    text("""
+        UPDATE shopping_lists
+        SET open_count = c.open_count, total_count = c.total_count
+        FROM (
+            SELECT
+                list_id,
+                SUM(CASE WHEN is_checked THEN 0 ELSE 1 END) AS open_count,
+                COUNT(*) AS total_count
+            FROM shopping_items
+            GROUP BY list_id
+        ) AS c
+        WHERE shopping_lists.id = c.list_id
+    """),
+)
+
+
+def repair_list_counts(db: Session) -> int:
+    """
+    Recompute open_count / total_count for every list from shopping_items
+    in one GROUP BY pass. Returns the number of lists that have items.
+    """
+    db.execute(_REPAIR_LIST_COUNTS[0])
+    res = db.execute(_REPAIR_LIST_COUNTS[1])
+    db.commit()
+    return res.rowcount or 0
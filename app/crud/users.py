@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app import models
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password, verify_and_update_password
+from app.core.session_cache import session_cache
 
 
 def get_user(db: Session, user_id: int):
@@ -46,24 +47,67 @@ def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user or not user.is_active:
         return None
-    if not verify_password(password, user.password_hash):
+    ok, new_hash = verify_and_update_password(password, user.password_hash)
+    if not ok:
         return None
+    if new_hash:
+        # Stored hash used outdated parameters; upgrade it transparently.
+        user.password_hash = new_hash
+        db.add(user)
+        db.commit()
+        session_cache.invalidate_user(user.id)
     return user
 
 
 def set_user_password(db: Session, user: models.User, password: str):
     user.password_hash = hash_password(password)
+    _bump_token_generation(user)
     db.add(user)
     db.commit()
+    _revoke_user_tokens(user)
 
 
 def set_user_admin(db: Session, user: models.User, is_admin: bool):
     user.is_admin = is_admin
+    _bump_token_generation(user)
     db.add(user)
     db.commit()
+    _revoke_user_tokens(user)
 
 
 def set_user_active(db: Session, user: models.User, is_active: bool):
     user.is_active = is_active
+    _bump_token_generation(user)
     db.add(user)
     db.commit()
+    _revoke_user_tokens(user)
+
+
+def enable_totp(db: Session, user: models.User, secret: str):
+    user.totp_secret = secret
+    user.totp_enabled = True
+    _bump_token_generation(user)
+    db.add(user)
+    db.commit()
+    _revoke_user_tokens(user)
+
+
+def disable_totp(db: Session, user: models.User):
+    user.totp_secret = None
+    user.totp_enabled = False
+    _bump_token_generation(user)
+    db.add(user)
+    db.commit()
+    _revoke_user_tokens(user)
+
+
+def _bump_token_generation(user: models.User):
+    user.token_generation = (user.token_generation or 0) + 1
+
+
+def _revoke_user_tokens(user: models.User):
+    """
+    Drop this worker's cached sessions. Signed tokens issued before the
+    generation bump are rejected by every worker on its next cache miss.
+    """
+    session_cache.invalidate_user(user.id)
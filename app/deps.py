@@ -1,31 +1,160 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from fastapi import Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from .core.config import settings
 from .core.db import get_db
+from .core.db_async import AsyncSessionLocal
+from .core.rate_limit import auth_ip_limiter, auth_account_limiter
+from .core.session_cache import session_cache, snapshot, CachedAuth
+from .core.signed_sessions import signed_sessions
+from .core.server_timing import phase
 from . import crud, models
-from .core.security import new_token
+from .crud import aio
+from .core.security import new_token, now_utc
 
 
 def get_current_session_token(request: Request) -> str | None:
     return request.cookies.get(settings.session_cookie)
 
 
+def client_ip(request: Request) -> str:
+    if settings.behind_proxy:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+            if hops:
+                return hops[max(0, len(hops) - max(1, settings.trusted_proxy_count))]
+    return request.client.host if request.client else "unknown"
+
+
 def get_current_user(
     request: Request,
     db: Session = Depends(get_db),
 ) -> models.User:
+    with phase("auth"):
+        return _load_current_user(request, db)
+
+
+def _load_current_user(request: Request, db: Session) -> models.User:
     token = get_current_session_token(request)
     if not token:
         raise HTTPException(status_code=401)
-    sess = crud.get_session_by_token(db, token)
-    if not sess:
+
+    if settings.session_backend == "signed":
+        sess, user = _user_from_signed_token(db, token)
+    else:
+        cached = session_cache.get(token, now_utc())
+        if cached:
+            sess, user = _attach_cached(db, cached)
+        else:
+            sess = crud.get_session_by_token(db, token)
+            if not sess:
+                raise HTTPException(status_code=401)
+            user = crud.get_user(db, sess.user_id)
+            if not user or not user.is_active:
+                raise HTTPException(status_code=401)
+            session_cache.put(token, snapshot(sess, user))
+
+        crud.touch_session(db, sess)
+    request.state.session = sess
+    request.state.user = user
+    return user
+
+
+def _attach_cached(db: Session, cached: CachedAuth) -> tuple[models.Session, models.User]:
+    """
+    Rebuild the session + user rows from a cache entry and attach them to
+    this request's db session without emitting a SELECT, so routes can keep
+    treating them as normal ORM instances.
+    """
+    user = models.User(**cached.user)
+    make_transient_to_detached(user)
+    user = db.merge(user, load=False)
+
+    if cached.session is None:
+        return None, user
+    sess = models.Session(**cached.session)
+    make_transient_to_detached(sess)
+    return db.merge(sess, load=False), user
+
+
+def _user_from_signed_token(db: Session, token: str) -> tuple[None, models.User]:
+    """
+    Signature and expiry are checked in memory; the user row comes from the
+    session cache, so a warm request does no queries. On a miss the token
+    generation and revoked_tokens are checked against the database.
+    """
+    claims = signed_sessions.load(token)
+    if not claims:
+        raise HTTPException(status_code=401)
+
+    cached = session_cache.get(token, now_utc())
+    if cached:
+        return _attach_cached(db, cached)
+
+    user = crud.get_user(db, claims["uid"])
+    if not user or not user.is_active or (user.token_generation or 0) != claims["gen"]:
+        raise HTTPException(status_code=401)
+    if crud.is_token_revoked(db, claims["jti"]):
         raise HTTPException(status_code=401)
-    user = crud.get_user(db, sess.user_id)
-    if not user or not user.is_active:
+    expires_at = datetime.utcfromtimestamp(claims["exp"])
+    session_cache.put(token, snapshot(None, user, expires_at=expires_at))
+    return None, user
+
+
+async def get_current_user_async(request: Request) -> models.User:
+    """
+    get_current_user() for async routes. A cache hit does no IO at all; the
+    returned rows are detached, so only their loaded columns are usable.
+    """
+    with phase("auth"):
+        return await _load_current_user_async(request)
+
+
+async def _load_current_user_async(request: Request) -> models.User:
+    token = get_current_session_token(request)
+    if not token:
         raise HTTPException(status_code=401)
+
+    sess = None
+    cached = session_cache.get(token, now_utc())
+    if settings.session_backend == "signed":
+        claims = signed_sessions.load(token)
+        if not claims:
+            raise HTTPException(status_code=401)
+
+    if cached:
+        user = models.User(**cached.user)
+        if cached.session is not None:
+            sess = models.Session(**cached.session)
+    else:
+        async with AsyncSessionLocal() as db:
+            if settings.session_backend == "signed":
+                user = await aio.get_user(db, claims["uid"])
+                if not user or not user.is_active or (user.token_generation or 0) != claims["gen"]:
+                    raise HTTPException(status_code=401)
+                if await aio.is_token_revoked(db, claims["jti"]):
+                    raise HTTPException(status_code=401)
+                expires_at = datetime.utcfromtimestamp(claims["exp"])
+                session_cache.put(token, snapshot(None, user, expires_at=expires_at))
+            else:
+                sess = await aio.get_session_by_token(db, token)
+                if not sess:
+                    raise HTTPException(status_code=401)
+                user = await aio.get_user(db, sess.user_id)
+                if not user or not user.is_active:
+                    raise HTTPException(status_code=401)
+                session_cache.put(token, snapshot(sess, user))
+
+    if sess is not None:
+        async with AsyncSessionLocal() as db:
+            await aio.touch_session(db, sess)
+
     request.state.session = sess
     request.state.user = user
     return user
@@ -49,3 +178,42 @@ def validate_csrf(request: Request, form_csrf: str | None) -> None:
     cookie_csrf = request.cookies.get(settings.csrf_cookie)
     if not cookie_csrf or not form_csrf or cookie_csrf != form_csrf:
         raise HTTPException(status_code=400, detail="Bad CSRF token")
+
+
+def set_csrf_cookie_if_needed(request: Request, resp):
+    token = getattr(request.state, "set_csrf", None)
+    if token:
+        resp.set_cookie(
+            settings.csrf_cookie,
+            token,
+            httponly=False,
+            samesite="lax",
+            secure=False,
+        )
+    return resp
+
+
+def check_auth_throttle(request: Request, account_key: str, redirect_to: str):
+    """
+    Check the per-IP and per-account limits before any password / TOTP work.
+    Returns (redirect, logged_key): redirect is set when over the limit, and
+    logged_key only on the first rejection of a lockout, which is the one
+    worth writing to the activity log; the rest are just counted.
+    """
+    if not settings.auth_rate_limit_enabled:
+        return None, None
+
+    ip_key = f"ip:{client_ip(request)}"
+    for limiter, key in ((auth_ip_limiter, ip_key), (auth_account_limiter, account_key)):
+        allowed, first_rejection = limiter.hit(key)
+        if allowed:
+            continue
+
+        minutes = max(1, limiter.retry_after(key) // 60)
+        request.session["flash"] = {
+            "type": "danger",
+            "message": f"Too many attempts. Try again in {minutes} minute(s).",
+        }
+        return RedirectResponse(redirect_to, status_code=302), (key if first_rejection else None)
+
+    return None, None
@@ -12,8 +12,16 @@ from .core.security import hash_password
 from . import models, crud
 from .routes import auth, dashboard, calendar, chores, mealplan, admin, shopping
 from app.core.migrations import run_migrations
+from app.core.query_stats import QueryStatsMiddleware, install_query_hooks
+from app.core.server_timing import ServerTimingMiddleware
+from app.core.session_touch import session_touches
+from app.core.session_reaper import session_reaper
+from app.core.activity import activity_writer
+from app.core.activity_retention import activity_retention
 from .routes import admin_activity
 from .routes import admin_categories
+from .routes import admin_analytics
+from .routes import admin_diagnostics
 
 
 def create_app() -> FastAPI:
@@ -28,8 +36,21 @@ def create_app() -> FastAPI:
         https_only=False,  # allow LAN use; rely on reverse proxy for TLS
     )
 
+    if settings.server_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware)
+
+    if settings.sql_instrumentation_enabled:
+        install_query_hooks()
+        app.add_middleware(QueryStatsMiddleware)
+
     app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+    if settings.async_db_enabled:
+        # Registered first so these async handlers win over the sync ones
+        # on the same paths.
+        from .routes import async_routes
+        app.include_router(async_routes.router)
+
     app.include_router(auth.router)
     app.include_router(dashboard.router)
     app.include_router(calendar.router)
@@ -39,6 +60,8 @@ def create_app() -> FastAPI:
     app.include_router(shopping.router)
     app.include_router(admin_activity.router)
     app.include_router(admin_categories.router)
+    app.include_router(admin_analytics.router)
+    app.include_router(admin_diagnostics.router)
 
 
     @app.get("/", include_in_schema=False)
@@ -47,16 +70,41 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     def _startup():
-        # Run additive migrations first
-        with SessionLocal() as db:
-            run_migrations(db)
-
-        # Ensure base tables exist (safe, idempotent)
-        models.Base.metadata.create_all(bind=engine)
+        # Pending SQL migrations + ORM tables. A no-op single SELECT when the
+        # schema is current; production can run `python -m app.cli migrate`
+        # before rolling out workers and turn this off.
+        if settings.migrate_on_startup:
+            run_migrations(engine, models.Base.metadata)
 
         # Ensure bootstrap admin user exists
         _ensure_bootstrap_admin()
 
+        if settings.activity_log_mode == "queued":
+            activity_writer.start()
+
+        activity_retention.start()
+
+        if settings.session_backend == "db" and settings.session_touch_mode == "write_behind":
+            session_touches.start()
+
+        if settings.session_reaper_enabled:
+            session_reaper.start()
+
+    @app.on_event("shutdown")
+    def _shutdown():
+        session_reaper.stop()
+        activity_retention.stop()
+
+        # Flush any buffered last_seen_at touches before the process exits
+        session_touches.stop()
+        activity_writer.stop()
+
+    @app.on_event("shutdown")
+    async def _shutdown_async_engine():
+        from .core.db_async import async_engine
+        if async_engine is not None:
+            await async_engine.dispose()
+
     return app
 
 
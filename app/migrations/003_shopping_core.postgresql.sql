@@ -0,0 +1,26 @@
+-- 003_shopping_core.sql (Postgres)
+
+CREATE TABLE IF NOT EXISTS shopping_shops (
+    id SERIAL PRIMARY KEY,
+    household_id INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shopping_lists (
+    id SERIAL PRIMARY KEY,
+    household_id INTEGER NOT NULL,
+    shop_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    is_archived BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shopping_items (
+    id SERIAL PRIMARY KEY,
+    list_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    is_checked BOOLEAN NOT NULL DEFAULT FALSE,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    category_id INTEGER,
+    created_at TIMESTAMP NOT NULL
+);
@@ -0,0 +1,9 @@
+-- 004_shopping_catergories.sql (Postgres)
+
+CREATE TABLE IF NOT EXISTS shopping_categories (
+    id SERIAL PRIMARY KEY,
+    household_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    color TEXT,
+    icon TEXT
+);
@@ -0,0 +1,13 @@
+-- 005_activity_log_indexes.sql
+
+CREATE INDEX IF NOT EXISTS ix_activity_log_timestamp
+    ON activity_log (timestamp);
+
+CREATE INDEX IF NOT EXISTS ix_activity_log_action_timestamp
+    ON activity_log (action, timestamp);
+
+CREATE INDEX IF NOT EXISTS ix_activity_log_actor_timestamp
+    ON activity_log (actor_user_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS ix_activity_log_entity
+    ON activity_log (entity_type, entity_id);
@@ -0,0 +1,14 @@
+-- 006_activity_rollups.sql
+-- Per (day, action, actor) counts, maintained by the activity writer.
+-- actor_user_id 0 means no signed-in actor (failed logins, system jobs).
+
+CREATE TABLE IF NOT EXISTS activity_rollups (
+    day TEXT NOT NULL,
+    action TEXT NOT NULL,
+    actor_user_id INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, action, actor_user_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_activity_rollups_action_day
+    ON activity_rollups (action, day);
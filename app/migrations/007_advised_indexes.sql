@@ -0,0 +1,21 @@
+-- Suggested by the index advisor (python -m app.cli index-advisor)
+
+-- shopping.list_items, shopping.count_open_items
+CREATE INDEX IF NOT EXISTS ix_shopping_items_list_id_is_checked_created_at
+    ON shopping_items (list_id, is_checked, created_at DESC);
+
+-- shopping.list_lists
+CREATE INDEX IF NOT EXISTS ix_shopping_lists_household_id_is_archived_created_at
+    ON shopping_lists (household_id, is_archived, created_at);
+
+-- shopping.list_shops
+CREATE INDEX IF NOT EXISTS ix_shopping_shops_household_id_name
+    ON shopping_shops (household_id, name);
+
+-- shopping_categories.list_categories
+CREATE INDEX IF NOT EXISTS ix_shopping_categories_household_id_name
+    ON shopping_categories (household_id, name);
+
+-- chores.list_chores
+CREATE INDEX IF NOT EXISTS ix_chores_household_id_is_active_created_at
+    ON chores (household_id, is_active, created_at);
@@ -0,0 +1,17 @@
+-- 008_shopping_list_counters.sql
+-- Backfill shopping_lists.open_count / total_count (columns are added by
+-- ensure_columns). Same statements as crud.repair_list_counts.
+
+UPDATE shopping_lists SET open_count = 0, total_count = 0;
+
+UPDATE shopping_lists
+SET open_count = c.open_count, total_count = c.total_count
+FROM (
+    SELECT
+        list_id,
+        SUM(CASE WHEN is_checked THEN 0 ELSE 1 END) AS open_count,
+        COUNT(*) AS total_count
+    FROM shopping_items
+    GROUP BY list_id
+) AS c
+WHERE shopping_lists.id = c.list_id;
@@ -66,6 +66,9 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     last_login_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    # Bumped to invalidate every signed session token issued to this user
+    token_generation: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     household: Mapped["Household"] = relationship(back_populates="users")
     sessions: Mapped[list["Session"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
@@ -84,6 +87,16 @@ class Session(Base):
     user: Mapped["User"] = relationship(back_populates="sessions")
 
 
+class RevokedToken(Base):
+    """Signed session tokens ended by logout, kept until they would have expired."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+
 class CalendarEvent(Base):
     __tablename__ = "calendar_events"
 
@@ -189,6 +202,10 @@ class ShoppingList(Base):
     name: Mapped[str] = mapped_column(String(120))
     is_archived: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Maintained by the crud item add / toggle / delete paths; rebuilt by
+    # `python -m app.cli shopping-counters-repair`.
+    open_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     household: Mapped["Household"] = relationship(back_populates="shopping_lists")
     shop: Mapped["ShoppingShop"] = relationship(back_populates="lists")
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
 from fastapi import Request
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
-templates = Jinja2Templates(directory="app/templates")
+from ..core.server_timing import phase
+
+
+class TimedTemplates(Jinja2Templates):
+    """Jinja2Templates that reports rendering time as the "render" Server-Timing phase."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        with phase("render"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+templates = TimedTemplates(directory="app/templates")
 
 
 def ctx(request: Request, **kwargs):
@@ -19,5 +31,16 @@ def ctx(request: Request, **kwargs):
     base.update(kwargs)
     return base
 
+
+def live_response(request: Request, event: dict | None, location: str):
+    """
+    The list page's live forms post with fetch and patch the row from the
+    returned event (the SSE echo may be on another worker); plain form
+    posts get the usual redirect. None means nothing changed: resync.
+    """
+    if request.headers.get("x-requested-with") == "fetch":
+        return JSONResponse(event or {"type": "resync"})
+    return RedirectResponse(location, status_code=302)
+
 from datetime import timedelta
 templates.env.globals['timedelta'] = timedelta
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Form, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, JSONResponse
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_db, get_read_db
 from ..deps import require_admin, get_or_set_csrf, validate_csrf
 from .. import crud, models
 from ._render import templates, ctx
 from ..core.activity import log_activity   
+from ..core.session_cache import session_cache
+from ..core.rate_limit import auth_ip_limiter, auth_account_limiter
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -17,7 +19,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/users", include_in_schema=False)
 def users_page(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin: models.User = Depends(require_admin),
 ):
     csrf = get_or_set_csrf(request)
@@ -169,3 +171,17 @@ def toggle_active(
 
     request.session["flash"] = {"type": "success", "message": "User status updated."}
     return RedirectResponse("/admin/users", status_code=302)
+
+
+@router.get("/session-cache", include_in_schema=False)
+def session_cache_stats(
+    admin: models.User = Depends(require_admin),
+):
+    return JSONResponse(session_cache.stats())
+
+
+@router.get("/auth-throttle", include_in_schema=False)
+def auth_throttle_stats(
+    admin: models.User = Depends(require_admin),
+):
+    return JSONResponse({"ip": auth_ip_limiter.stats(), "account": auth_account_limiter.stats()})
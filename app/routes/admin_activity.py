@@ -1,12 +1,21 @@
+import csv
+import io
+import json
+import os
+
 from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import datetime
+from datetime import date, datetime
+from urllib.parse import urlencode
 
-from ..core.db import get_db
-from ..deps import get_current_user
+from ..core.db import get_read_db, ReadSessionLocal
+from ..core.activity import activity_writer
+from ..core.activity_retention import archive_path, iter_archive, list_archives
+from ..deps import get_current_user, require_admin
 from ..routes._render import templates, ctx
-from .. import models
+from .. import crud, models
+from ..crud.activity import EXPORT_COLUMNS
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -17,6 +26,7 @@ ACTION_LABELS = {
     "auth.login.mfa_required": "Login – MFA required",
     "auth.mfa.success": "MFA verification successful",
     "auth.mfa.failed": "MFA verification failed",
+    "auth.throttled": "Login throttled",
     "auth.logout": "Logout",
     "auth.mfa.enabled": "MFA enabled",
     "auth.mfa.disabled": "MFA disabled",
@@ -27,33 +37,53 @@ ACTION_LABELS = {
 }
 
 
+PAGE_SIZE = 100
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _filter_kwargs(filters: dict) -> dict:
+    return {
+        "action": filters["action"] or None,
+        "actor_user_id": int(filters["actor"]) if filters["actor"].isdigit() else None,
+        "date_from": _parse_date(filters["date_from"]),
+        "date_to": _parse_date(filters["date_to"]),
+    }
+
+
 @router.get("/activity", include_in_schema=False)
 def activity_log(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
+    action: str = "",
+    actor: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    before: str = "",
 ):
     # Admin-only access
     if not user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
-    raw_rows = db.execute(
-        text("""
-            SELECT
-                al.timestamp,
-                al.actor_email,
-                al.action,
-                u.display_name AS target_name,
-                u.email AS target_email,
-                al.details
-            FROM activity_log al
-            LEFT JOIN users u
-                ON al.entity_type = 'user'
-               AND al.entity_id = u.id
-            ORDER BY al.timestamp DESC
-            LIMIT 500
-        """)
-    ).fetchall()
+    filters = {
+        "action": action.strip(),
+        "actor": actor.strip(),
+        "date_from": date_from.strip(),
+        "date_to": date_to.strip(),
+    }
+
+    raw_rows, next_cursor = crud.list_activity(
+        db,
+        **_filter_kwargs(filters),
+        before=before or None,
+        limit=PAGE_SIZE,
+    )
 
     rows = []
     for r in raw_rows:
@@ -69,7 +99,96 @@ def activity_log(
         data["action_label"] = ACTION_LABELS.get(data["action"], data["action"])
         rows.append(data)
 
+    active_filters = {k: v for k, v in filters.items() if v}
+    next_url = None
+    if next_cursor:
+        next_url = "/admin/activity?" + urlencode({**active_filters, "before": next_cursor})
+
     return templates.TemplateResponse(
         "admin/activity_log.html",
-        ctx(request, rows=rows),
+        ctx(
+            request,
+            rows=rows,
+            filters=filters,
+            action_labels=ACTION_LABELS,
+            actors=crud.list_users(db, user.household_id),
+            next_url=next_url,
+            export_query=urlencode(active_filters),
+            archives=list_archives(),
+            newest_url=("/admin/activity?" + urlencode(active_filters)) if before else None,
+        ),
+    )
+
+
+@router.get("/activity/writer", include_in_schema=False)
+def activity_writer_stats(
+    admin: models.User = Depends(require_admin),
+):
+    return JSONResponse(activity_writer.stats())
+
+
+@router.get("/activity/archive/{month}", include_in_schema=False)
+def activity_archive(
+    month: str,
+    admin: models.User = Depends(require_admin),
+):
+    try:
+        path = archive_path(month)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return StreamingResponse(
+        iter_archive(month),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="activity-{month}.jsonl"'},
+    )
+
+
+def _export_chunks(fmt: str, filter_kwargs: dict):
+    # Own db session: the request's session is closed before a streaming
+    # body is sent.
+    with ReadSessionLocal() as db:
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buf.getvalue()
+
+        for chunk in crud.iter_activity(db, **filter_kwargs):
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows(chunk)
+                yield buf.getvalue()
+            else:
+                yield "".join(json.dumps(dict(r._mapping), default=str) + "\n" for r in chunk)
+
+
+@router.get("/activity/export", include_in_schema=False)
+def activity_export(
+    admin: models.User = Depends(require_admin),
+    format: str = "csv",
+    action: str = "",
+    actor: str = "",
+    date_from: str = "",
+    date_to: str = "",
+):
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="format must be csv or jsonl")
+
+    filters = {
+        "action": action.strip(),
+        "actor": actor.strip(),
+        "date_from": date_from.strip(),
+        "date_to": date_to.strip(),
+    }
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"activity-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+
+    return StreamingResponse(
+        _export_chunks(format, _filter_kwargs(filters)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
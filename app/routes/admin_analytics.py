@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from statistics import median
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+from app.core.db import get_read_db
+from app.deps import require_admin
+from app.routes._render import templates, ctx
+from app import crud
+
+router = APIRouter(prefix="/admin/analytics", tags=["admin"])
+
+
+FAILED_ACTIONS = ["auth.login.failed", "auth.mfa.failed", "auth.throttled"]
+
+
+def _series(rows, days: list[str]) -> list[dict]:
+    totals = {r.day: r.total for r in rows}
+    peak = max(totals.values(), default=0)
+    return [
+        {"day": d, "total": totals.get(d, 0), "pct": round(100 * totals.get(d, 0) / peak) if peak else 0}
+        for d in days
+    ]
+
+
+@router.get("", include_in_schema=False)
+def analytics_page(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    admin=Depends(require_admin),
+    days: int = 30,
+):
+    days = max(1, min(days, 365))
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+    day_keys = [(since + timedelta(days=i)).isoformat() for i in range(days)]
+
+    logins = _series(crud.rollup_daily(db, actions=["auth.login.success", "auth.mfa.success"], since=since), day_keys)
+    failed = _series(crud.rollup_daily(db, actions=FAILED_ACTIONS, since=since), day_keys)
+    shopping = _series(crud.rollup_daily(db, action_prefix="shopping.", since=since), day_keys)
+
+    # A "spike" is a day well above the typical failed-login volume.
+    typical = median([d["total"] for d in failed]) if failed else 0
+    for d in failed:
+        d["spike"] = d["total"] >= max(10, 3 * typical)
+
+    return templates.TemplateResponse(
+        "admin/analytics.html",
+        ctx(
+            request,
+            days=days,
+            logins=logins,
+            failed=failed,
+            shopping=shopping,
+            top_actors=crud.rollup_top_actors(db, since=since),
+        ),
+    )
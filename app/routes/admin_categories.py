@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.core.config import settings
 from app.deps import require_admin, get_or_set_csrf, validate_csrf
 from app.core.activity import log_activity
@@ -30,7 +30,7 @@ def _set_csrf_cookie_if_needed(request: Request, resp):
 @router.get("", include_in_schema=False)
 def categories_page(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin=Depends(require_admin),
 ):
     csrf = get_or_set_csrf(request)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db, engine, read_engine, sqlite_pragmas, pool_metrics, read_pool_metrics
+from app.core.activity import activity_writer
+from app.core.list_events import list_events
+from app.core.query_stats import route_totals
+from app.core.index_advisor import analyse, next_migration_path, suggested_migration
+from app.core.rate_limit import auth_ip_limiter, auth_account_limiter
+from app.core.session_cache import session_cache
+from app.core.session_reaper import session_reaper
+from app.core.session_touch import session_touches
+from app.deps import require_admin
+from app.routes._render import templates, ctx
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["admin"])
+
+
+SQLITE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+    "page_size",
+    "wal_autocheckpoint",
+)
+
+
+def _effective_pragmas(db: Session) -> list[dict]:
+    configured = sqlite_pragmas()
+    rows = []
+    for name in SQLITE_PRAGMAS:
+        value = db.execute(text(f"PRAGMA {name}")).scalar()
+        rows.append({"name": name, "value": value, "configured": configured.get(name, "")})
+    return rows
+
+
+@router.get("", include_in_schema=False)
+def diagnostics_page(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    pragmas = _effective_pragmas(db) if engine.dialect.name == "sqlite" else []
+
+    sections = {
+        "Connection pool": pool_metrics.stats(engine.pool),
+        "Read connection pool": (
+            read_pool_metrics.stats(read_engine.pool) if read_engine is not engine else {"shared": "uses the main pool"}
+        ),
+        "Session cache": session_cache.stats(),
+        "Session last-seen buffer": session_touches.stats(),
+        "Session reaper": session_reaper.stats(),
+        "Activity writer": activity_writer.stats(),
+        "Login throttle (per IP)": auth_ip_limiter.stats(),
+        "Login throttle (per account)": auth_account_limiter.stats(),
+        "SQL per request": route_totals.stats(),
+        "Live shopping lists": list_events.stats(),
+    }
+
+    return templates.TemplateResponse(
+        "admin/diagnostics.html",
+        ctx(
+            request,
+            dialect=engine.dialect.name,
+            pragmas=pragmas,
+            sections=sections,
+            route_queries=route_totals.top(),
+        ),
+    )
+
+
+@router.get("/indexes", include_in_schema=False)
+def index_advisor_page(
+    request: Request,
+    admin=Depends(require_admin),
+):
+    findings = analyse(engine)
+    migration = suggested_migration(findings)
+    return templates.TemplateResponse(
+        "admin/index_advisor.html",
+        ctx(
+            request,
+            dialect=engine.dialect.name,
+            findings=findings,
+            migration=migration,
+            migration_name=next_migration_path(engine.dialect.name).rsplit("/", 1)[-1] if migration else None,
+        ),
+    )
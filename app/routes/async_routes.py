@@ -0,0 +1,206 @@
+"""
+async def versions of the hottest routes, backed by core/db_async.py.
+
+Only included (ahead of the sync routers, so they take precedence) when
+settings.async_db_enabled is on. The sync handlers in auth / dashboard /
+shopping stay as they are and serve these paths otherwise.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Form, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.db_async import get_async_db
+from ..core.rate_limit import auth_account_limiter
+from ..core.signed_sessions import signed_sessions
+from ..core.activity import log_activity_async
+from ..deps import (
+    get_current_user_async,
+    get_or_set_csrf,
+    validate_csrf,
+    check_auth_throttle,
+    set_csrf_cookie_if_needed,
+)
+from ..crud import aio, toggled_event
+from .. import models
+from ._render import templates, ctx, live_response
+
+
+router = APIRouter(tags=["async"])
+
+
+# -------------------------
+# Login
+# -------------------------
+
+@router.post("/login", include_in_schema=False)
+async def login_post(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    email: str = Form(...),
+    password: str = Form(...),
+    csrf: str = Form(...),
+):
+    validate_csrf(request, csrf)
+
+    account_key = f"email:{email.lower().strip()}"
+    throttled, logged_key = check_auth_throttle(request, account_key, "/login")
+    if logged_key:
+        await log_activity_async(
+            db,
+            request=request,
+            action="auth.throttled",
+            details={"key": logged_key, "path": request.url.path},
+        )
+    if throttled:
+        return throttled
+
+    user = await aio.authenticate_user(db, email, password)
+    if not user:
+        await log_activity_async(
+            db,
+            request=request,
+            action="auth.login.failed",
+            details={"email": email},
+        )
+        request.session["flash"] = {"type": "danger", "message": "Invalid email or password."}
+        return RedirectResponse("/login", status_code=302)
+
+    if user.totp_enabled and user.totp_secret:
+        await log_activity_async(
+            db,
+            request=request,
+            action="auth.login.mfa_required",
+            entity_type="user",
+            entity_id=user.id,
+        )
+        request.session["pending_user_id"] = user.id
+        return RedirectResponse("/mfa", status_code=302)
+
+    auth_account_limiter.reset(account_key)
+
+    if settings.session_backend == "signed":
+        session_token = signed_sessions.issue(user)
+    else:
+        session_token = (await aio.create_session(db, user, settings.session_ttl_minutes)).token
+
+    resp = RedirectResponse("/dashboard", status_code=302)
+    resp.set_cookie(
+        settings.session_cookie,
+        session_token,
+        httponly=True,
+        samesite="lax",
+        secure=False,
+        max_age=settings.session_ttl_minutes * 60,
+    )
+
+    await log_activity_async(
+        db,
+        request=request,
+        action="auth.login.success",
+        entity_type="user",
+        entity_id=user.id,
+    )
+    return set_csrf_cookie_if_needed(request, resp)
+
+
+# -------------------------
+# Dashboard
+# -------------------------
+
+@router.get("/dashboard", include_in_schema=False)
+async def dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(get_current_user_async),
+):
+    csrf = get_or_set_csrf(request)
+    upcoming = await aio.list_upcoming_events(db, user.household_id, datetime.utcnow(), limit=10)
+
+    chores = await aio.list_chores(db, user.household_id)
+    last_done_by_chore = await aio.last_completed_by_chore(db, [ch.id for ch in chores])
+    chore_cards = []
+    today = datetime.utcnow().date()
+    for ch in chores:
+        last_done = last_done_by_chore.get(ch.id)
+        due = True
+        if last_done and ch.every_n_days > 0:
+            due = (today - last_done).days >= ch.every_n_days
+        chore_cards.append({"chore": ch, "last_done": last_done, "due": due})
+
+    start = today
+    end = today + timedelta(days=6)
+    meals = await aio.list_meals_in_range(db, user.household_id, start, end)
+
+    return templates.TemplateResponse(
+        "dashboard.html",
+        ctx(
+            request,
+            csrf=csrf,
+            upcoming=upcoming,
+            chore_cards=chore_cards[:8],
+            meals=meals,
+            meal_range=(start, end),
+        ),
+    )
+
+
+# -------------------------
+# Shopping
+# -------------------------
+
+@router.get("/shopping/{list_id}", include_in_schema=False)
+async def shopping_list_page(
+    request: Request,
+    list_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(get_current_user_async),
+):
+    csrf = get_or_set_csrf(request)
+
+    view = await aio.shopping_list_view(db, list_id, user.household_id)
+    if view is None:
+        return RedirectResponse("/shopping", status_code=302)
+
+    resp = templates.TemplateResponse(
+        "shopping/list.html",
+        ctx(
+            request,
+            csrf=csrf,
+            lst=view.lst,
+            groups=view.groups,
+            categories=view.categories,
+            item_count=view.item_count,
+        ),
+    )
+    return set_csrf_cookie_if_needed(request, resp)
+
+
+@router.post("/shopping/item/{item_id}/toggle", include_in_schema=False)
+async def shopping_toggle_item(
+    request: Request,
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(get_current_user_async),
+    csrf: str = Form(...),
+):
+    validate_csrf(request, csrf)
+
+    row = await aio.toggle_owned_item(db, item_id, user.household_id)
+    if row is None:
+        return live_response(request, None, "/shopping")
+
+    await log_activity_async(
+        db,
+        request=request,
+        action="shopping.item.toggled",
+        entity_type="shopping_item",
+        entity_id=row.id,
+        details={"checked": bool(row.is_checked)},
+    )
+
+    return live_response(request, toggled_event(row), f"/shopping/{row.list_id}")
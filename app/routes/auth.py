@@ -7,7 +7,16 @@ from sqlalchemy.orm import Session
 from ..core.config import settings
 from ..core.db import get_db
 from ..core.security import totp_generate_secret, totp_provisioning_uri, totp_verify
-from ..deps import get_or_set_csrf, validate_csrf, get_current_user
+from ..core.rate_limit import auth_account_limiter
+from ..core.session_cache import session_cache
+from ..core.signed_sessions import signed_sessions
+from ..deps import (
+    get_or_set_csrf,
+    validate_csrf,
+    get_current_user,
+    check_auth_throttle,
+    set_csrf_cookie_if_needed,
+)
 from .. import crud, models
 from ._render import templates, ctx
 from ..core.activity import log_activity
@@ -16,24 +25,60 @@ from ..core.activity import log_activity
 router = APIRouter(tags=["auth"])
 
 
-def _set_csrf_cookie_if_needed(request: Request, resp):
-    token = getattr(request.state, "set_csrf", None)
-    if token:
-        resp.set_cookie(
-            settings.csrf_cookie,
-            token,
-            httponly=False,
-            samesite="lax",
-            secure=False,
+def _throttle(request: Request, db: Session, account_key: str, redirect_to: str):
+    redirect, logged_key = check_auth_throttle(request, account_key, redirect_to)
+    if logged_key:
+        log_activity(
+            db,
+            request=request,
+            action="auth.throttled",
+            details={"key": logged_key, "path": request.url.path},
         )
+    return redirect
+
+
+def _start_session(db: Session, user: models.User) -> str:
+    if settings.session_backend == "signed":
+        return signed_sessions.issue(user)
+    return crud.create_session(db, user, settings.session_ttl_minutes).token
+
+
+def _reissue_signed_token(request: Request, resp, user: models.User):
+    """
+    After a change that bumps users.token_generation for the current user,
+    hand them a fresh token so only their other sessions are logged out.
+    """
+    if settings.session_backend != "signed":
+        return resp
+    old = request.cookies.get(settings.session_cookie)
+    if old:
+        session_cache.invalidate_token(old)
+    resp.set_cookie(
+        settings.session_cookie,
+        signed_sessions.issue(user),
+        httponly=True,
+        samesite="lax",
+        secure=False,
+        max_age=settings.session_ttl_minutes * 60,
+    )
     return resp
 
 
+def _end_session(db: Session, token: str) -> None:
+    if settings.session_backend == "signed":
+        claims = signed_sessions.revoke(token)
+        session_cache.invalidate_token(token)
+        if claims:
+            crud.revoke_signed_token(db, claims)
+    else:
+        crud.delete_session(db, token)
+
+
 @router.get("/login", include_in_schema=False)
 def login_page(request: Request):
     csrf = get_or_set_csrf(request)
     resp = templates.TemplateResponse("auth/login.html", ctx(request, csrf=csrf))
-    return _set_csrf_cookie_if_needed(request, resp)
+    return set_csrf_cookie_if_needed(request, resp)
 
 
 @router.post("/login", include_in_schema=False)
@@ -46,6 +91,11 @@ def login_post(
 ):
     validate_csrf(request, csrf)
 
+    account_key = f"email:{email.lower().strip()}"
+    throttled = _throttle(request, db, account_key, "/login")
+    if throttled:
+        return throttled
+
     user = crud.authenticate_user(db, email, password)
     if not user:
         log_activity(
@@ -68,11 +118,13 @@ def login_post(
         request.session["pending_user_id"] = user.id
         return RedirectResponse("/mfa", status_code=302)
 
-    sess = crud.create_session(db, user, settings.session_ttl_minutes)
+    auth_account_limiter.reset(account_key)
+
+    session_token = _start_session(db, user)
     resp = RedirectResponse("/dashboard", status_code=302)
     resp.set_cookie(
         settings.session_cookie,
-        sess.token,
+        session_token,
         httponly=True,
         samesite="lax",
         secure=False,
@@ -104,7 +156,7 @@ def mfa_page(request: Request):
     if not request.session.get("pending_user_id"):
         return RedirectResponse("/login", status_code=302)
     resp = templates.TemplateResponse("auth/mfa.html", ctx(request, csrf=csrf))
-    return _set_csrf_cookie_if_needed(request, resp)
+    return set_csrf_cookie_if_needed(request, resp)
 
 
 @router.post("/mfa", include_in_schema=False)
@@ -119,6 +171,10 @@ def mfa_post(
     if not user_id:
         return RedirectResponse("/login", status_code=302)
 
+    throttled = _throttle(request, db, f"user:{int(user_id)}", "/mfa")
+    if throttled:
+        return throttled
+
     user = crud.get_user(db, int(user_id))
     if not user or not user.totp_enabled or not user.totp_secret:
         request.session.pop("pending_user_id", None)
@@ -144,11 +200,12 @@ def mfa_post(
     )
 
     request.session.pop("pending_user_id", None)
-    sess = crud.create_session(db, user, settings.session_ttl_minutes)
+    auth_account_limiter.reset(f"user:{user.id}")
+    session_token = _start_session(db, user)
     resp = RedirectResponse("/dashboard", status_code=302)
     resp.set_cookie(
         settings.session_cookie,
-        sess.token,
+        session_token,
         httponly=True,
         samesite="lax",
         secure=False,
@@ -168,7 +225,7 @@ def logout(
     validate_csrf(request, csrf)
     token = request.cookies.get(settings.session_cookie)
     if token:
-        crud.delete_session(db, token)
+        _end_session(db, token)
 
     log_activity(
         db,
@@ -190,7 +247,7 @@ def account_page(
 ):
     csrf = get_or_set_csrf(request)
     resp = templates.TemplateResponse("auth/account.html", ctx(request, csrf=csrf, totp_uri=None))
-    return _set_csrf_cookie_if_needed(request, resp)
+    return set_csrf_cookie_if_needed(request, resp)
 
 
 @router.post("/account/totp/start", include_in_schema=False)
@@ -215,7 +272,7 @@ def totp_verify_page(
     secret = request.session.get("totp_secret_pending")
     totp_uri = totp_provisioning_uri(user.email, secret, issuer=settings.app_name) if secret else None
     resp = templates.TemplateResponse("auth/totp_verify.html", ctx(request, csrf=csrf, totp_uri=totp_uri))
-    return _set_csrf_cookie_if_needed(request, resp)
+    return set_csrf_cookie_if_needed(request, resp)
 
 
 @router.post("/account/totp/verify", include_in_schema=False)
@@ -247,7 +304,7 @@ def totp_verify_post(
 
     request.session.pop("totp_secret_pending", None)
     request.session["flash"] = {"type": "success", "message": "Two-factor authentication enabled."}
-    return RedirectResponse("/account", status_code=302)
+    return _reissue_signed_token(request, RedirectResponse("/account", status_code=302), user)
 
 
 @router.post("/account/totp/disable", include_in_schema=False)
@@ -269,4 +326,4 @@ def totp_disable(
     )
 
     request.session["flash"] = {"type": "success", "message": "Two-factor authentication disabled."}
-    return RedirectResponse("/account", status_code=302)
+    return _reissue_signed_token(request, RedirectResponse("/account", status_code=302), user)
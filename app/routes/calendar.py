@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_db, get_read_db
 from ..deps import get_current_user, get_or_set_csrf, validate_csrf
 from .. import crud, models
 from ._render import templates, ctx
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/calendar", tags=["calendar"])
 @router.get("", include_in_schema=False)
 def calendar_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
 ):
     csrf = get_or_set_csrf(request)
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_db, get_read_db
 from ..deps import get_current_user, get_or_set_csrf, validate_csrf
 from .. import crud, models
 from ._render import templates, ctx
@@ -19,15 +19,16 @@ router = APIRouter(prefix="/chores", tags=["chores"])
 @router.get("", include_in_schema=False)
 def chores_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
 ):
     csrf = get_or_set_csrf(request)
     chores = crud.list_chores(db, user.household_id)
+    last_done_by_chore = crud.last_completed_by_chore(db, [ch.id for ch in chores])
     today = datetime.utcnow().date()
     enriched = []
     for ch in chores:
-        last_done = crud.last_completed_on(db, ch.id)
+        last_done = last_done_by_chore.get(ch.id)
         due = True
         if last_done and ch.every_n_days > 0:
             due = (today - last_done).days >= ch.every_n_days
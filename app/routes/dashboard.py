@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_read_db
 from ..deps import get_current_user, get_or_set_csrf
 from .. import crud, models
 from ._render import templates, ctx
@@ -18,17 +18,18 @@ router = APIRouter(tags=["dashboard"])
 @router.get("/dashboard", include_in_schema=False)
 def dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
 ):
     csrf = get_or_set_csrf(request)
     upcoming = crud.list_upcoming_events(db, user.household_id, datetime.utcnow(), limit=10)
 
     chores = crud.list_chores(db, user.household_id)
+    last_done_by_chore = crud.last_completed_by_chore(db, [ch.id for ch in chores])
     chore_cards = []
     today = datetime.utcnow().date()
     for ch in chores:
-        last_done = crud.last_completed_on(db, ch.id)
+        last_done = last_done_by_chore.get(ch.id)
         due = True
         if last_done and ch.every_n_days > 0:
             due = (today - last_done).days >= ch.every_n_days
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_db, get_read_db
 from ..deps import get_current_user, get_or_set_csrf, validate_csrf
 from .. import crud, models
 from ._render import templates, ctx
@@ -24,7 +24,7 @@ def _start_of_week(d: date) -> date:
 @router.get("", include_in_schema=False)
 def mealplan_week(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
     week: str | None = None,
 ):
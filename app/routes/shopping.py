@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Form, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.core.config import settings
 from app.deps import get_current_user, get_or_set_csrf, validate_csrf
 from app.core.activity import log_activity
+from app.core.list_events import list_events, sse_stream
 from app import crud, models
-from ._render import templates, ctx
+from ._render import templates, ctx, live_response
 
 router = APIRouter(tags=["shopping"])
 
@@ -38,30 +39,17 @@ def _set_csrf_cookie_if_needed(request: Request, resp):
 @router.get("/shopping", include_in_schema=False)
 def shopping_home(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
 ):
     csrf = get_or_set_csrf(request)
 
     shops = crud.list_shops(db, user.household_id)
-    lists = crud.list_lists(db, user.household_id, include_archived=False)
-
-    list_rows = []
-    for lst in lists:
-        list_rows.append(
-            {
-                "id": lst.id,
-                "name": lst.name,
-                "shop_id": lst.shop_id,
-                "shop_name": lst.shop.name if lst.shop else "",
-                "created_at": lst.created_at,
-                "open_count": crud.count_open_items(db, lst.id),
-            }
-        )
+    lists = crud.list_lists_with_counts(db, user.household_id, include_archived=False)
 
     resp = templates.TemplateResponse(
         "shopping/index.html",
-        ctx(request, csrf=csrf, shops=shops, lists=list_rows),
+        ctx(request, csrf=csrf, shops=shops, lists=lists),
     )
     return _set_csrf_cookie_if_needed(request, resp)
 
@@ -133,32 +121,24 @@ def shopping_create_list(
 def shopping_list_page(
     request: Request,
     list_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: models.User = Depends(get_current_user),
 ):
     csrf = get_or_set_csrf(request)
 
-    lst = crud.get_list(db, list_id)
-    if not lst or lst.household_id != user.household_id:
+    view = crud.shopping_list_view(db, list_id, user.household_id)
+    if view is None:
         return RedirectResponse("/shopping", status_code=302)
 
-    items = crud.list_items(db, list_id)
-    categories = crud.list_categories(db, user.household_id)
-
-    by_cat = {}
-    for item in items:
-        label = item.category.name if item.category else "Uncategorised"
-        by_cat.setdefault(label, []).append(item)
-
     resp = templates.TemplateResponse(
         "shopping/list.html",
         ctx(
             request,
             csrf=csrf,
-            lst=lst,
-            items=items,
-            categories=categories,
-            by_cat=by_cat,
+            lst=view.lst,
+            groups=view.groups,
+            categories=view.categories,
+            item_count=view.item_count,
         ),
     )
     return _set_csrf_cookie_if_needed(request, resp)
@@ -207,36 +187,78 @@ def shopping_add_item(
     return RedirectResponse(f"/shopping/{list_id}", status_code=302)
 
 
-@router.post("/shopping/item/{item_id}/toggle", include_in_schema=False)
-def shopping_toggle_item(
+@router.post("/shopping/{list_id}/item/bulk", include_in_schema=False)
+def shopping_add_items_bulk(
     request: Request,
-    item_id: int,
+    list_id: int,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
+    lines: str = Form(""),
+    category_id: str = Form(""),
     csrf: str = Form(...),
 ):
     validate_csrf(request, csrf)
 
-    item = crud.get_item(db, item_id)
-    if not item:
-        return RedirectResponse("/shopping", status_code=302)
-
-    lst = crud.get_list(db, item.list_id)
+    lst = crud.get_list(db, list_id)
     if not lst or lst.household_id != user.household_id:
         return RedirectResponse("/shopping", status_code=302)
 
-    crud.toggle_item(db, item)
+    categories = {c.name.strip().lower(): c.id for c in crud.list_categories(db, user.household_id)}
+    try:
+        default_id = int(category_id)
+    except ValueError:
+        default_id = None
+    if default_id not in categories.values():
+        default_id = None
+
+    items = crud.parse_bulk_items(
+        lines,
+        categories,
+        default_category_id=default_id,
+        max_items=settings.shopping_bulk_add_max_items,
+    )
+    added = crud.add_items_bulk(db, list_id, items)
+
+    if added:
+        log_activity(
+            db,
+            request=request,
+            action="shopping.items.bulk_added",
+            entity_type="shopping_list",
+            entity_id=list_id,
+            details={"count": added, "names": [it["name"] for it in items[:20]]},
+        )
+        request.session["flash"] = {"type": "success", "message": f"Added {added} item{'s' if added != 1 else ''}."}
+    else:
+        request.session["flash"] = {"type": "warning", "message": "No items found to add."}
+
+    return RedirectResponse(f"/shopping/{list_id}", status_code=302)
+
+
+@router.post("/shopping/item/{item_id}/toggle", include_in_schema=False)
+def shopping_toggle_item(
+    request: Request,
+    item_id: int,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+    csrf: str = Form(...),
+):
+    validate_csrf(request, csrf)
+
+    row = crud.toggle_owned_item(db, item_id, user.household_id)
+    if row is None:
+        return live_response(request, None, "/shopping")
 
     log_activity(
         db,
         request=request,
         action="shopping.item.toggled",
         entity_type="shopping_item",
-        entity_id=item.id,
-        details={"checked": bool(item.is_checked)},
+        entity_id=row.id,
+        details={"checked": bool(row.is_checked)},
     )
 
-    return RedirectResponse(f"/shopping/{item.list_id}", status_code=302)
+    return live_response(request, crud.toggled_event(row), f"/shopping/{row.list_id}")
 
 
 @router.post("/shopping/item/{item_id}/delete", include_in_schema=False)
@@ -249,27 +271,58 @@ def shopping_delete_item(
 ):
     validate_csrf(request, csrf)
 
-    item = crud.get_item(db, item_id)
-    if not item:
-        return RedirectResponse("/shopping", status_code=302)
-
-    lst = crud.get_list(db, item.list_id)
-    if not lst or lst.household_id != user.household_id:
-        return RedirectResponse("/shopping", status_code=302)
-
-    list_id = item.list_id
-    crud.delete_item(db, item)
+    row = crud.delete_owned_item(db, item_id, user.household_id)
+    if row is None:
+        return live_response(request, None, "/shopping")
 
     log_activity(
         db,
         request=request,
         action="shopping.item.deleted",
         entity_type="shopping_item",
-        entity_id=item_id,
-        details={"list_id": list_id},
+        entity_id=row.id,
+        details={"list_id": row.list_id},
     )
 
-    return RedirectResponse(f"/shopping/{list_id}", status_code=302)
+    return live_response(request, crud.deleted_event(row), f"/shopping/{row.list_id}")
+
+
+# -------------------------
+# Live updates (Server-Sent Events)
+# -------------------------
+
+def _watched_list_id(
+    list_id: int,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+) -> int | None:
+    try:
+        lst = crud.get_list(db, list_id)
+        return lst.id if lst and lst.household_id == user.household_id else None
+    finally:
+        # The stream stays open for as long as the page does; don't keep a
+        # pooled connection checked out for it.
+        db.close()
+
+
+@router.get("/shopping/{list_id}/events", include_in_schema=False)
+async def shopping_list_events(request: Request, list_id: int | None = Depends(_watched_list_id)):
+    if not settings.shopping_events_enabled or list_id is None:
+        return Response(status_code=404)
+
+    sub = list_events.subscribe(list_id, request.headers.get("last-event-id"))
+    if sub is None:
+        return Response(status_code=503, headers={"Retry-After": "30"})
+
+    return StreamingResponse(
+        sse_stream(
+            sub,
+            settings.shopping_events_heartbeat_seconds,
+            settings.shopping_events_max_stream_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # -------------------------
@@ -0,0 +1,43 @@
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import SlidingWindowLimiter
+from app.deps import client_ip
+
+
+def _request(forwarded: str | None, peer: str = "10.0.0.2") -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_uses_hop_appended_by_our_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "behind_proxy", True)
+    monkeypatch.setattr(settings, "trusted_proxy_count", 1)
+    assert client_ip(_request("1.2.3.4, 203.0.113.9")) == "203.0.113.9"
+    assert client_ip(_request("203.0.113.9")) == "203.0.113.9"
+
+
+def test_trusted_proxy_count(monkeypatch):
+    monkeypatch.setattr(settings, "behind_proxy", True)
+    monkeypatch.setattr(settings, "trusted_proxy_count", 2)
+    assert client_ip(_request("6.6.6.6, 203.0.113.9, 172.16.0.1")) == "203.0.113.9"
+    assert client_ip(_request("203.0.113.9")) == "203.0.113.9"
+
+
+def test_header_ignored_without_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "behind_proxy", False)
+    assert client_ip(_request("1.2.3.4")) == "10.0.0.2"
+
+
+def test_spoofed_forwarded_for_does_not_bypass_ip_limit(monkeypatch):
+    monkeypatch.setattr(settings, "behind_proxy", True)
+    monkeypatch.setattr(settings, "trusted_proxy_count", 1)
+    limiter = SlidingWindowLimiter(max_attempts=5, window_seconds=60)
+
+    results = []
+    for i in range(10):
+        # New fake leftmost address every time; the proxy appends the real one.
+        ip = client_ip(_request(f"198.51.100.{i}, 203.0.113.9"))
+        results.append(limiter.hit(f"ip:{ip}")[0])
+
+    assert results == [True] * 5 + [False] * 5
@@ -0,0 +1,59 @@
+import pytest
+
+from app.crud import parse_bulk_items
+
+CATEGORIES = {"dairy": 1, "bakery": 2, "veg": 3}
+
+
+def _one(line: str, **kwargs) -> dict:
+    items = parse_bulk_items(line, CATEGORIES, **kwargs)
+    assert len(items) == 1
+    return items[0]
+
+
+@pytest.mark.parametrize("line", ["2x milk", "2 x milk", "2 milk", "milk x2", "milk x 2", "milk ×2"])
+def test_quantity_forms(line):
+    assert _one(line) == {"name": "milk", "quantity": 2, "category_id": None}
+
+
+@pytest.mark.parametrize("line", ["2 litre milk", "2l milk", "2 L milk", "2 x bottles of milk", "2 packs of milk"])
+def test_leading_quantity_drops_unit_word(line):
+    assert _one(line) == {"name": "milk", "quantity": 2, "category_id": None}
+
+
+@pytest.mark.parametrize("line", ["2 lemons", "2 bags"])
+def test_unit_word_alone_is_the_name(line):
+    assert _one(line)["name"] == line.split()[1]
+
+
+@pytest.mark.parametrize("line", ["- eggs", "* eggs", "• eggs", "1. eggs", "2) eggs", "[ ] eggs", "[x] eggs", "- [ ] eggs", "1. [ ] eggs"])
+def test_bullets_checkboxes_and_numbering_are_stripped(line):
+    assert _one(line)["name"] == "eggs"
+
+
+def test_bullet_then_quantity():
+    assert _one("- [ ] 3x eggs") == {"name": "eggs", "quantity": 3, "category_id": None}
+
+
+def test_category_hint():
+    assert _one("bread @Bakery") == {"name": "bread", "quantity": 1, "category_id": 2}
+    assert _one("bread #bakery")["category_id"] == 2
+
+
+def test_unknown_hint_is_kept_in_name_and_falls_back():
+    assert _one("apples @nope", default_category_id=3) == {"name": "apples @nope", "quantity": 1, "category_id": 3}
+
+
+def test_section_header_sets_category_for_following_lines():
+    items = parse_bulk_items("milk\nDairy:\ncheese\nyoghurt @veg\nVeg:\ncarrots", CATEGORIES)
+    assert [(i["name"], i["category_id"]) for i in items] == [
+        ("milk", None),
+        ("cheese", 1),
+        ("yoghurt", 3),
+        ("carrots", 3),
+    ]
+
+
+def test_blank_lines_skipped_and_max_items():
+    assert parse_bulk_items("\n  \n", CATEGORIES) == []
+    assert len(parse_bulk_items("\n".join(f"item {i}" for i in range(10)), CATEGORIES, max_items=4)) == 4